@@ -0,0 +1,115 @@
+"""admission.py — Admission control for model-backed endpoints
+KIET University · JNTU Kakinada
+--------------------------------------
+At most `concurrency` model jobs run at once.  Further requests wait in a
+bounded queue split into priority lanes; when a lane or the whole queue
+is full the request is rejected immediately (429 / 503 + Retry-After)
+instead of piling up in Starlette's threadpool until it times out.
+
+  • lane "interactive" — /predict, /predict/stream (served first)
+  • lane "bulk"        — /pdf-analyze (may use at most half of the queue)
+
+Only requests that actually need the model are admitted here; periodic
+table, molar mass, quiz and cached answers bypass the queue entirely.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+
+LANES = {"interactive": 0, "bulk": 1}
+
+
+class QueueFull(Exception):
+    def __init__(self, status_code, retry_after, message):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, concurrency=8, max_queue=32, lane_limits=None):
+        self.concurrency = max(1, int(concurrency))
+        self.max_queue   = max(0, int(max_queue))
+        self.lane_limits = lane_limits or {
+            "interactive": self.max_queue,
+            "bulk":        max(1, self.max_queue // 2),
+        }
+
+        self._running  = 0
+        self._waiters  = []                      # heap of (priority, seq, lane, future)
+        self._queued   = {lane: 0 for lane in LANES}
+        self._seq      = itertools.count()
+        self._admitted = 0
+        self._rejected = {lane: 0 for lane in LANES}
+        self._service  = 5.0                     # EWMA of seconds per job
+
+    # ── public API ────────────────────────────────────────────────
+
+    @asynccontextmanager
+    async def slot(self, lane="interactive"):
+        await self.acquire(lane)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._service = 0.8 * self._service + 0.2 * (time.monotonic() - started)
+            self.release()
+
+    async def acquire(self, lane="interactive"):
+        if lane not in LANES:
+            raise ValueError(f"unknown admission lane '{lane}'")
+
+        if self._running < self.concurrency and not any(self._queued.values()):
+            self._running  += 1
+            self._admitted += 1
+            return
+
+        queued = sum(self._queued.values())
+        if queued >= self.max_queue:
+            self._rejected[lane] += 1
+            raise QueueFull(503, self.retry_after(), "Server is busy — please retry shortly.")
+        if self._queued[lane] >= self.lane_limits.get(lane, self.max_queue):
+            self._rejected[lane] += 1
+            raise QueueFull(429, self.retry_after(), "Too many queued requests of this kind — please retry shortly.")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (LANES[lane], next(self._seq), lane, future))
+        self._queued[lane] += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed to us just as we were cancelled.
+                self.release()
+            raise
+        finally:
+            self._queued[lane] -= 1
+        self._admitted += 1
+
+    def release(self):
+        while self._waiters:
+            _, _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(True)      # the slot passes straight to the waiter
+                return
+        self._running -= 1
+
+    def retry_after(self):
+        queued = sum(self._queued.values())
+        return max(1, math.ceil(self._service * (queued + 1) / self.concurrency))
+
+    def stats(self):
+        return {
+            "running":      self._running,
+            "concurrency":  self.concurrency,
+            "queue_depth":  sum(self._queued.values()),
+            "max_queue":    self.max_queue,
+            "queued":       dict(self._queued),
+            "admitted":     self._admitted,
+            "rejected":     dict(self._rejected),
+            "retry_after":  self.retry_after(),
+        }
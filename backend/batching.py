@@ -0,0 +1,207 @@
+"""batching.py — Dynamic micro-batching for FLAN-T5 generation
+KIET University · JNTU Kakinada
+--------------------------------------
+Concurrent generate_ai() calls are collected for a few milliseconds,
+grouped into buckets by prompt length (and max_new_tokens), and each
+bucket is run as ONE padded model.generate() call.  Every caller gets
+back its own decoded result through a Future.
+
+  • max_wait_ms     — longest time the oldest request waits for company
+  • max_batch_size  — a full bucket is dispatched immediately
+  • bucket_width    — prompts whose token lengths fall in the same
+                      window of this width are batched together, so
+                      short questions are not padded up to long PDF prompts
+  • concurrency     — how many batches may run at once (1 for in-process
+                      generation, one per worker with worker_pool.py)
+
+submit_group() enqueues several prompts that must run together (e.g. the
+summary and video script of one PDF); they form a batch of their own.
+
+Requests may carry a cancellation token (see cancellation.py); requests
+whose token is already cancelled when their batch starts are dropped.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+
+
+class _PendingRequest:
+    __slots__ = ("prompt", "max_new_tokens", "bucket", "token", "future", "arrived")
+
+    def __init__(self, prompt, max_new_tokens, bucket, token=None):
+        self.prompt         = prompt
+        self.max_new_tokens = max_new_tokens
+        self.bucket         = bucket
+        self.token          = token
+        self.future         = Future()
+        self.arrived        = time.monotonic()
+
+
+class MicroBatcher:
+    """
+    Background batching engine.
+
+    run_batch(prompts, max_new_tokens, tokens) must return one decoded
+    string per prompt, in order.  measure(prompt) returns the prompt length
+    in tokens and is only used to pick a bucket.  on_cancel(requests, tokens)
+    is told about requests dropped before they started.
+    """
+
+    def __init__(self, run_batch, measure=len, max_batch_size=8,
+                 max_wait_ms=10.0, bucket_width=64, on_cancel=None, concurrency=1):
+        self.run_batch      = run_batch
+        self.measure        = measure
+        self.on_cancel      = on_cancel
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait       = max(0.0, float(max_wait_ms)) / 1000.0
+        self.bucket_width   = max(1, int(bucket_width))
+
+        self._pending = []
+        self._cond    = threading.Condition()
+
+        self._batches       = 0
+        self._requests      = 0
+        self._largest_batch = 0
+
+        self._threads = [
+            threading.Thread(target=self._loop, name=f"chemai-batcher-{i}", daemon=True)
+            for i in range(max(1, int(concurrency)))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # ── public API ────────────────────────────────────────────────
+
+    def submit(self, prompt, max_new_tokens=300, token=None):
+        bucket = (max_new_tokens, self.measure(prompt) // self.bucket_width)
+        req    = _PendingRequest(prompt, max_new_tokens, bucket, token)
+        with self._cond:
+            self._pending.append(req)
+            self._cond.notify()
+        return req.future
+
+    def generate(self, prompt, max_new_tokens=300, token=None):
+        return self.submit(prompt, max_new_tokens, token).result()
+
+    def submit_group(self, prompts, max_new_tokens, token=None):
+        """
+        Run `prompts` as ONE batch; max_new_tokens may be a list with one
+        limit per prompt.  The future resolves to a list of results.
+        """
+        req = _PendingRequest(list(prompts), max_new_tokens, None, token)
+        req.bucket = ("group", id(req))
+        with self._cond:
+            self._pending.append(req)
+            self._cond.notify()
+        return req.future
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queued":         len(self._pending),
+                "batches":        self._batches,
+                "requests":       self._requests,
+                "avg_batch_size": round(self._requests / self._batches, 2) if self._batches else 0.0,
+                "largest_batch":  self._largest_batch,
+                "max_wait_ms":    self.max_wait * 1000.0,
+                "max_batch_size": self.max_batch_size,
+            }
+
+    # ── scheduler ─────────────────────────────────────────────────
+
+    def _full_bucket(self):
+        counts = {}
+        for req in self._pending:
+            counts[req.bucket] = counts.get(req.bucket, 0) + 1
+            if counts[req.bucket] >= self.max_batch_size:
+                return req.bucket
+        return None
+
+    def _take_batch(self, bucket):
+        batch, rest = [], []
+        for req in self._pending:
+            if req.bucket == bucket and len(batch) < self.max_batch_size:
+                batch.append(req)
+            else:
+                rest.append(req)
+        self._pending = rest
+        return batch
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                # Wait until a bucket fills up or the oldest request has
+                # waited long enough; then serve that bucket.
+                while True:
+                    if not self._pending:
+                        self._cond.wait()
+                        continue
+                    bucket = self._full_bucket()
+                    if bucket is not None:
+                        break
+                    remaining = self._pending[0].arrived + self.max_wait - time.monotonic()
+                    if remaining <= 0:
+                        bucket = self._pending[0].bucket
+                        break
+                    self._cond.wait(remaining)
+
+                batch = self._take_batch(bucket)
+                self._batches       += 1
+                self._requests      += len(batch)
+                self._largest_batch  = max(self._largest_batch, len(batch))
+
+            self._run(batch)
+
+    def _run(self, batch):
+        dropped = [req for req in batch if req.token is not None and req.token.cancelled]
+        for req in dropped:
+            req.future.cancel()
+        if dropped and self.on_cancel:
+            self.on_cancel(len(dropped), sum(_token_budget(req) for req in dropped))
+
+        batch = [req for req in batch if req.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        if isinstance(batch[0].prompt, list):
+            self._run_group(batch[0])
+            return
+        try:
+            results = _checked(self.run_batch(
+                [req.prompt for req in batch],
+                batch[0].max_new_tokens,
+                [req.token for req in batch],
+            ), len(batch))
+        except Exception as e:
+            for req in batch:
+                req.future.set_exception(e)
+            return
+        for req, result in zip(batch, results):
+            req.future.set_result(result)
+
+    def _run_group(self, req):
+        try:
+            results = _checked(self.run_batch(
+                req.prompt,
+                req.max_new_tokens,
+                [req.token] * len(req.prompt),
+            ), len(req.prompt))
+        except Exception as e:
+            req.future.set_exception(e)
+            return
+        req.future.set_result(results)
+
+
+def _checked(results, expected):
+    """A result per prompt, or an error: zip() would leave callers waiting forever."""
+    results = list(results)
+    if len(results) != expected:
+        raise RuntimeError(f"batch runner returned {len(results)} results for {expected} prompts")
+    return results
+
+
+def _token_budget(req):
+    if isinstance(req.max_new_tokens, list):
+        return sum(req.max_new_tokens)
+    count = len(req.prompt) if isinstance(req.prompt, list) else 1
+    return req.max_new_tokens * count
@@ -0,0 +1,308 @@
+"""cache.py — Answer caching for the Chemistry AI backend
+KIET University · JNTU Kakinada
+--------------------------------------
+  • MemoryStore  — in-process LRU with TTL (default)
+  • SQLiteStore  — disk-backed LRU with TTL and an optional byte budget;
+                   one file can be shared by several uvicorn workers on
+                   the same host
+  • AnswerCache  — two-level cache in front of the model routes of
+                   generate_answer():
+                     L1  (route, question)           → English answer
+                     L2  (route, question, language) → translated answer
+                   A Telugu request that misses L2 but hits L1 only pays
+                   for translation, not for a new beam search.
+  • DocumentCache — content-addressed /pdf-analyze cache keyed on the
+                   sha256 of the uploaded bytes
+
+Stores are interchangeable: anything with get(key) / set(key, value) /
+clear() / __len__ can be passed to AnswerCache.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_question(text):
+    q = re.sub(r'\s+', ' ', (text or "").lower()).strip()
+    return q.rstrip(" ?.!")
+
+
+# ══════════════════════════════════════════════
+# STORES
+# ══════════════════════════════════════════════
+
+class MemoryStore:
+    def __init__(self, max_entries=1024, ttl=3600):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl         = ttl
+        self._data       = OrderedDict()
+        self._lock       = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, stored_at = item
+            if self.ttl and time.time() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteStore:
+    def __init__(self, path, table="cache", max_entries=10000, ttl=86400, max_bytes=None):
+        self.path        = path
+        self.table       = re.sub(r'[^A-Za-z0-9_]', '_', table)
+        self.max_entries = max(1, int(max_entries))
+        self.ttl         = ttl
+        self.max_bytes   = max_bytes
+        self._lock       = threading.Lock()
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL, "
+            "size INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = [row[1] for row in self._conn.execute(f"PRAGMA table_info({self.table})")]
+        if "size" not in columns:
+            # Tables created before the byte budget existed.
+            self._conn.execute(
+                f"ALTER TABLE {self.table} ADD COLUMN size INTEGER NOT NULL DEFAULT 0"
+            )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table}(accessed)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self.ttl and now - created > self.ttl:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        return json.loads(value)
+
+    def set(self, key, value):
+        now  = time.time()
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created, accessed, size) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, data, now, now, len(data.encode("utf-8"))),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+        if not self.max_bytes:
+            return
+        total = self.size_bytes(locked=True)
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used rows until the table fits the byte budget.
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute(
+            f"SELECT key, size FROM {self.table} ORDER BY accessed ASC"
+        ):
+            if total - freed <= self.max_bytes:
+                break
+            victims.append((key,))
+            freed += size
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", victims)
+
+    def size_bytes(self, locked=False):
+        query = f"SELECT COALESCE(SUM(size), 0) FROM {self.table}"
+        if locked:
+            return self._conn.execute(query).fetchone()[0]
+        with self._lock:
+            return self._conn.execute(query).fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+def make_store(backend, name, max_entries, ttl, path="cache/chemai_cache.sqlite3"):
+    """Build a store from configuration: 'memory' or 'sqlite'."""
+    if backend == "sqlite":
+        return SQLiteStore(path, table=name, max_entries=max_entries, ttl=ttl)
+    return MemoryStore(max_entries=max_entries, ttl=ttl)
+
+
+# ══════════════════════════════════════════════
+# TWO-LEVEL ANSWER CACHE
+# ══════════════════════════════════════════════
+
+class AnswerCache:
+    def __init__(self, english_store, translation_store):
+        self.english      = english_store
+        self.translations = translation_store
+        self._lock        = threading.Lock()
+        self._counters    = {
+            "english_hits": 0, "english_misses": 0,
+            "translation_hits": 0, "translation_misses": 0,
+        }
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get_or_compute(self, route, question, language, compute, translate,
+                       cacheable=lambda answer: bool(answer)):
+        """
+        Return the answer for `question` on `route` in `language`.
+        compute() produces the English answer on an L1 miss;
+        translate(text, language) produces the localised answer on an L2 miss.
+        Only answers that pass cacheable() are stored, translations included.
+        """
+        base_key = f"{route}|{normalize_question(question)}"
+        language = language or "en"
+
+        if language != "en":
+            translated = self.translations.get(f"{base_key}|{language}")
+            if translated is not None:
+                self._count("translation_hits")
+                return translated
+            self._count("translation_misses")
+
+        english = self.english.get(base_key)
+        if english is not None:
+            self._count("english_hits")
+        else:
+            self._count("english_misses")
+            english = compute()
+            if cacheable(english):
+                self.english.set(base_key, english)
+
+        if language == "en":
+            return english
+
+        translated = translate(english, language)
+        if cacheable(english) and cacheable(translated) and translated != english:
+            self.translations.set(f"{base_key}|{language}", translated)
+        return translated
+
+    def contains(self, route, question):
+        """True when the English answer for (route, question) is cached."""
+        return self.english.get(f"{route}|{normalize_question(question)}") is not None
+
+    def clear(self):
+        self.english.clear()
+        self.translations.clear()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        for level in ("english", "translation"):
+            hits   = counters[f"{level}_hits"]
+            total  = hits + counters[f"{level}_misses"]
+            counters[f"{level}_hit_ratio"] = round(hits / total, 3) if total else 0.0
+        counters["english_size"]     = len(self.english)
+        counters["translation_size"] = len(self.translations)
+        return counters
+
+
+# ══════════════════════════════════════════════
+# CONTENT-ADDRESSED DOCUMENT CACHE
+# ══════════════════════════════════════════════
+
+class DocumentCache:
+    """
+    Keys are derived from the sha256 of the uploaded document and of the
+    pipeline parameters (`params`: page limits, chunking, ...):
+        text|<params>|<digest>              → extracted page texts
+        result|<params>|<digest>|<language> → analyze_pdf_text() result
+    A document's content never changes under its hash, so entries only
+    leave the store through size-based eviction.
+    """
+
+    def __init__(self, store, params=""):
+        self.store     = store
+        self.params    = hashlib.sha256(params.encode("utf-8")).hexdigest()[:12]
+        self._lock     = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "text_hits": 0, "text_misses": 0}
+
+    @staticmethod
+    def digest(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def _get(self, key, counter):
+        value = self.store.get(key)
+        with self._lock:
+            self._counters[counter + ("hits" if value is not None else "misses")] += 1
+        return value
+
+    def get_text(self, digest):
+        return self._get(f"text|{self.params}|{digest}", "text_")
+
+    def set_text(self, digest, pages):
+        self.store.set(f"text|{self.params}|{digest}", pages)
+
+    def get_result(self, digest, language):
+        return self._get(f"result|{self.params}|{digest}|{language or 'en'}", "")
+
+    def set_result(self, digest, language, result):
+        self.store.set(f"result|{self.params}|{digest}|{language or 'en'}", result)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        total = counters["hits"] + counters["misses"]
+        counters["hit_ratio"] = round(counters["hits"] / total, 3) if total else 0.0
+        counters["entries"]   = len(self.store)
+        if hasattr(self.store, "size_bytes"):
+            counters["bytes"] = self.store.size_bytes()
+        return counters
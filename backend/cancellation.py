@@ -0,0 +1,94 @@
+"""cancellation.py — Deadlines and cancellation for in-flight generation
+KIET University · JNTU Kakinada
+--------------------------------------
+  • CancellationToken    — per-request flag, cancelled explicitly (client
+                           disconnected) or implicitly when its deadline passes
+  • CancellationCriteria — transformers StoppingCriteria that ends
+                           model.generate() once every request in the batch
+                           has been cancelled
+  • stats                — counters of cancelled requests and of the decoder
+                           steps (tokens) that were never computed because of it
+"""
+
+import threading
+import time
+
+import torch
+from transformers import StoppingCriteria, StoppingCriteriaList
+
+
+class GenerationCancelled(Exception):
+    pass
+
+
+class CancellationToken:
+    def __init__(self, timeout=None):
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.reason   = None
+        self._event   = threading.Event()
+
+    def cancel(self, reason="cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self):
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline")
+        return self._event.is_set()
+
+    def remaining(self):
+        """Seconds until the deadline (None = no deadline)."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+
+class CancellationStats:
+    def __init__(self):
+        self._lock               = threading.Lock()
+        self.requests_cancelled  = 0
+        self.tokens_saved        = 0
+
+    def record(self, requests, tokens):
+        with self._lock:
+            self.requests_cancelled += requests
+            self.tokens_saved       += max(0, tokens)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests_cancelled": self.requests_cancelled,
+                "tokens_saved":       self.tokens_saved,
+            }
+
+
+stats = CancellationStats()
+
+
+class CancellationCriteria(StoppingCriteria):
+    """
+    Stops generation once every token in `tokens` is cancelled.  A batch
+    keeps running while at least one of its callers is still waiting.
+    """
+
+    def __init__(self, tokens, max_new_tokens):
+        self.tokens         = list(tokens)
+        self.max_new_tokens = max_new_tokens
+        self._stopped       = False
+
+    def __call__(self, input_ids, scores, **kwargs):
+        stop = all(t is not None and t.cancelled for t in self.tokens)
+        if stop and not self._stopped:
+            self._stopped = True
+            generated = input_ids.shape[-1] - 1   # minus the decoder start token
+            stats.record(len(self.tokens), (self.max_new_tokens - generated) * len(self.tokens))
+        return torch.full((input_ids.shape[0],), stop, dtype=torch.bool, device=input_ids.device)
+
+
+def stopping_criteria(tokens, max_new_tokens):
+    """A StoppingCriteriaList for model.generate(), or None if nothing can be cancelled."""
+    if not tokens or all(t is None for t in tokens):
+        return None
+    return StoppingCriteriaList([CancellationCriteria(tokens, max_new_tokens)])
@@ -0,0 +1,131 @@
+"""compile_model.py — One-time LoRA merge ("compile") step
+KIET University · JNTU Kakinada
+--------------------------------------
+Merges the LoRA adapter in MyFinetunedModel/ into the FLAN-T5 base
+weights and writes a single safetensors checkpoint plus manifest.json
+(file sizes + SHA-256 checksums) to MyFinetunedModel-merged/.
+
+On the next startup model.py finds the manifest and loads the merged,
+memory-mapped checkpoint directly — no PEFT wrapper, no LoRA indirection
+in every forward pass, no base-model download.
+
+Usage:
+    python compile_model.py            # merge adapter and write checkpoint
+    python compile_model.py --verify   # re-check every checksum in the manifest
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+
+MANIFEST_NAME  = "manifest.json"
+WEIGHTS_NAME   = "model.safetensors"
+MANIFEST_FORMAT = 1
+
+
+def sha256_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_manifest(folder, **info):
+    files = {}
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if name == MANIFEST_NAME or not os.path.isfile(path):
+            continue
+        files[name] = {"bytes": os.path.getsize(path), "sha256": sha256_file(path)}
+
+    manifest = {
+        "format":  MANIFEST_FORMAT,
+        "created": datetime.utcnow().isoformat() + "Z",
+        "weights": WEIGHTS_NAME,
+        "files":   files,
+        **info,
+    }
+    with open(os.path.join(folder, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def verify_manifest(folder, full=False):
+    """
+    Return (ok, reason).  The quick check compares file sizes only, so
+    startup never has to read the whole checkpoint; full=True also
+    recomputes every SHA-256.
+    """
+    manifest_path = os.path.join(folder, MANIFEST_NAME)
+    if not os.path.isfile(manifest_path):
+        return False, "no manifest"
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except Exception as e:
+        return False, f"unreadable manifest ({e})"
+
+    if manifest.get("format") != MANIFEST_FORMAT:
+        return False, "unsupported manifest format"
+    if manifest.get("weights") not in manifest.get("files", {}):
+        return False, "weights missing from manifest"
+
+    for name, meta in manifest["files"].items():
+        path = os.path.join(folder, name)
+        if not os.path.isfile(path):
+            return False, f"missing file {name}"
+        if os.path.getsize(path) != meta["bytes"]:
+            return False, f"size mismatch for {name}"
+        if full and sha256_file(path) != meta["sha256"]:
+            return False, f"checksum mismatch for {name}"
+    return True, "ok"
+
+
+def compile_checkpoint(output_dir):
+    # Force model.py to build the plain fp32 PyTorch PEFT-wrapped model we
+    # are about to merge, whatever the serving environment asks for.
+    for name, value in (("CHEMAI_PRECISION", "fp32"), ("CHEMAI_BACKEND", "torch")):
+        if os.environ.get(name, value) != value:
+            print(f"[ChemAI] Ignoring {name}={os.environ[name]} — the checkpoint is saved as {value}.")
+    os.environ["CHEMAI_USE_MERGED"] = "0"
+    os.environ["CHEMAI_PRECISION"]  = "fp32"
+    os.environ["CHEMAI_BACKEND"]    = "torch"
+    os.environ["CHEMAI_WORKERS"]    = "0"     # no inference pool for a CLI
+    import model as chem
+
+    print("[ChemAI] Merging LoRA adapter into base weights...")
+    merged = chem.model.merge_and_unload()
+    merged.eval()
+
+    os.makedirs(output_dir, exist_ok=True)
+    merged.save_pretrained(output_dir, safe_serialization=True, max_shard_size="20GB")
+    chem.tokenizer.save_pretrained(output_dir)
+
+    manifest = write_manifest(
+        output_dir,
+        base_model=chem.BASE_MODEL,
+        adapter=chem.ADAPTER_PATH,
+    )
+    size_mb = manifest["files"][WEIGHTS_NAME]["bytes"] / (1024 * 1024)
+    print(f"[ChemAI] Merged checkpoint written to '{output_dir}/' ({size_mb:.1f} MB).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge the LoRA adapter into a single checkpoint.")
+    parser.add_argument("--output", default="MyFinetunedModel-merged")
+    parser.add_argument("--verify", action="store_true", help="only verify an existing checkpoint")
+    args = parser.parse_args()
+
+    if args.verify:
+        ok, reason = verify_manifest(args.output, full=True)
+        print(f"[ChemAI] {args.output}: {reason}")
+        raise SystemExit(0 if ok else 1)
+
+    compile_checkpoint(args.output)
+
+
+if __name__ == "__main__":
+    main()
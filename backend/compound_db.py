@@ -0,0 +1,225 @@
+"""compound_db.py — Offline compound synonym database (name → SMILES)
+KIET University · JNTU Kakinada
+--------------------------------------
+smiles_map in model.py covers about fifty compounds; everything else used
+to answer "No structure available".  This module keeps a large synonym
+table in SQLite instead of Python dicts: one row per compound and one
+row per normalised name, so a lookup is a single index probe.
+
+Build it once from backend/:
+
+    python compound_db.py import compounds.tsv          # or .csv / .csv.gz
+    python compound_db.py lookup "acetylsalicylic acid"
+
+The file needs a header with at least `name` and `smiles`; `synonyms`
+(separated by "|" or ";"), `formula` and `inchikey` are optional.
+
+  • lookup(name)       — exact match on the normalised name
+  • find_in_text(text) — leftmost-longest name mentioned in a question,
+                         probing every word n-gram in one query; a
+                         one-word name that is also an everyday word
+                         ("lead", "salt") only counts when the question
+                         asks for a structure or is just that word
+  • hot names are kept in an LRU (cache.MemoryStore), misses included
+"""
+
+import argparse
+import csv
+import gzip
+import os
+import re
+import sqlite3
+import threading
+
+from cache import MemoryStore
+from encyclopedia import STOPWORDS
+
+COLUMNS       = ("name", "formula", "smiles", "inchikey")
+MAX_NGRAM     = 6
+_SYNONYM_SEP  = re.compile(r"[|;]")
+_EDGE_PUNCT   = "?!.,:;\"“”‘’`"
+_STRUCTURE    = {"structure", "draw", "molecule", "smiles", "formula", "compound"}
+_SKIP_WORDS   = STOPWORDS | _STRUCTURE
+# Compound names that are mostly used as ordinary English words.
+_COMMON_WORDS = {"lead", "salt", "acid", "base", "gas", "oil", "air", "light", "glass", "spirit"}
+
+
+def normalize_name(name):
+    return " ".join(name.casefold().replace("’", "'").split())
+
+
+# ══════════════════════════════════════════════
+# RUNTIME LOOKUP
+# ══════════════════════════════════════════════
+
+class CompoundDB:
+    def __init__(self, path, cache_entries=4096):
+        self.path      = path
+        self._lock     = threading.Lock()
+        self._conn     = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._hot      = MemoryStore(max_entries=cache_entries, ttl=None)
+        self._counters = {"hits": 0, "misses": 0, "lru_hits": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _query(self, norms):
+        """{norm: record} for the names in `norms` that are in the database."""
+        found = {}
+        norms = list(norms)
+        for i in range(0, len(norms), 500):
+            batch = norms[i:i + 500]
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT n.norm, c.name, c.formula, c.smiles, c.inchikey "
+                    "FROM names n JOIN compounds c ON c.id = n.compound_id "
+                    f"WHERE n.norm IN ({','.join('?' * len(batch))}) ORDER BY c.id",
+                    batch,
+                ).fetchall()
+            for norm, *record in rows:
+                found.setdefault(norm, dict(zip(COLUMNS, record)))
+        return found
+
+    def lookup(self, name):
+        """{"name", "formula", "smiles", "inchikey"} for a compound name, or None."""
+        norm = normalize_name(name)
+        if not norm:
+            return None
+        cached = self._hot.get(norm)
+        if cached is not None:
+            self._count("lru_hits")
+            return cached or None
+        record = self._query([norm]).get(norm)
+        self._count("hits" if record else "misses")
+        self._hot.set(norm, record or False)
+        return record
+
+    def find_in_text(self, text, max_words=MAX_NGRAM):
+        """The leftmost-longest compound name mentioned in `text`, or None."""
+        words  = [w.strip(_EDGE_PUNCT) for w in normalize_name(text).split()]
+        common = len(words) > 1 and _STRUCTURE.isdisjoint(words)
+        spans  = {}
+        for i in range(len(words)):
+            for j in range(min(len(words), i + max_words), i, -1):
+                if words[i] in _SKIP_WORDS or words[j - 1] in _SKIP_WORDS:
+                    continue
+                if j - i == 1 and common and words[i] in _COMMON_WORDS:
+                    continue
+                spans[(i, j)] = " ".join(words[i:j])
+        if not spans:
+            return None
+        found = self._query(set(spans.values()))
+        for (i, j), norm in spans.items():         # i ascending, longest first
+            if norm in found:
+                self._count("hits")
+                self._hot.set(norm, found[norm])
+                return found[norm]
+        self._count("misses")
+        return None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM compounds").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        counters["lru_entries"] = len(self._hot)
+        return counters
+
+
+def open_compound_db(path, cache_entries=4096):
+    """The database at `path`, or None when it has not been built."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        db = CompoundDB(path, cache_entries)
+        print(f"[CompoundDB] {len(db)} compounds loaded from {path}.")
+        return db
+    except sqlite3.Error as e:
+        print(f"[CompoundDB] Could not open {path}: {e}")
+        return None
+
+
+# ══════════════════════════════════════════════
+# IMPORTER
+# ══════════════════════════════════════════════
+
+def iter_rows(source):
+    opener    = gzip.open if source.endswith(".gz") else open
+    base      = source[:-3] if source.endswith(".gz") else source
+    delimiter = "," if base.endswith(".csv") else "\t"
+    with opener(source, "rt", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f, delimiter=delimiter)
+        fields = {(h or "").strip().lower(): h for h in reader.fieldnames or []}
+        if "name" not in fields or "smiles" not in fields:
+            raise ValueError(f"{source} needs 'name' and 'smiles' columns (found {list(fields)})")
+        for row in reader:
+            item = {key: (row.get(fields[key]) or "").strip() if key in fields else ""
+                    for key in COLUMNS + ("synonyms",)}
+            if item["name"] and item["smiles"]:
+                yield item
+
+
+def build_db(path, sources):
+    """Build a fresh database from `sources` and swap it in atomically."""
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.execute(
+        "CREATE TABLE compounds (id INTEGER PRIMARY KEY, name TEXT NOT NULL, "
+        "formula TEXT, smiles TEXT NOT NULL, inchikey TEXT)"
+    )
+    conn.execute(
+        "CREATE TABLE names (norm TEXT NOT NULL, compound_id INTEGER NOT NULL, "
+        "PRIMARY KEY (norm, compound_id)) WITHOUT ROWID"
+    )
+    imported = 0
+    for source in sources:
+        for item in iter_rows(source):
+            cursor = conn.execute(
+                "INSERT INTO compounds (name, formula, smiles, inchikey) VALUES (?, ?, ?, ?)",
+                tuple(item[key] or None for key in COLUMNS),
+            )
+            names = {normalize_name(n) for n in [item["name"], *_SYNONYM_SEP.split(item["synonyms"])]}
+            conn.executemany(
+                "INSERT OR IGNORE INTO names (norm, compound_id) VALUES (?, ?)",
+                [(n, cursor.lastrowid) for n in names if n],
+            )
+            imported += 1
+            if imported % 10000 == 0:
+                conn.commit()
+                print(f"[CompoundDB] {imported} compounds...")
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    os.replace(tmp_path, path)
+    print(f"[CompoundDB] Imported {imported} compounds into {path}.")
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline compound synonym database (SQLite).")
+    parser.add_argument("--db", default="compounds.sqlite3")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="(re)build the database from .csv / .tsv files (optionally .gz)")
+    imp.add_argument("sources", nargs="+")
+
+    lookup = sub.add_parser("lookup", help="resolve a name, or find one inside a question")
+    lookup.add_argument("name")
+
+    args = parser.parse_args()
+    if args.command == "import":
+        build_db(args.db, args.sources)
+    else:
+        db = open_compound_db(args.db)
+        if db is None:
+            raise SystemExit(f"No database at {args.db} — run 'python compound_db.py import' first.")
+        print(db.lookup(args.name) or db.find_in_text(args.name))
+
+
+if __name__ == "__main__":
+    main()
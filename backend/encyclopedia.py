@@ -0,0 +1,265 @@
+"""encyclopedia.py — Offline chemistry encyclopedia (SQLite FTS5)
+KIET University · JNTU Kakinada
+--------------------------------------
+A local full-text index that wikipedia_lookup() in model.py queries
+before (or instead of) the live Wikipedia API, so the fallback answer
+takes milliseconds and keeps working on air-gapped lab servers.
+
+Build it once from backend/:
+
+    python encyclopedia.py import articles/                 # .txt / .md files
+    python encyclopedia.py import chemistry.jsonl           # {"title", "text"} per line
+    python encyclopedia.py import enwiki-pages-articles.xml.bz2
+    python encyclopedia.py search "what is an ionic bond"
+
+Articles are ranked with BM25 (title matches weigh 10× body matches) and
+answered with a summary of their first two sentences, extracted at import
+time.  An article only counts as an answer when it contains at least
+`min_coverage` of the question's terms and at least one of them is in its
+title; otherwise lookup() returns None and the caller goes online.  Pages
+from a Wikipedia dump are kept only when their opening text mentions one
+of --keywords.
+"""
+
+import argparse
+import bz2
+import json
+import os
+import re
+import sqlite3
+import threading
+import xml.etree.ElementTree as ET
+
+DEFAULT_KEYWORDS = [
+    "chemistry", "chemical", "compound", "element", "molecule", "reaction",
+    "acid", "ion", "atom", "bond", "organic", "mineral", "polymer",
+]
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "define", "definition",
+    "describe", "does", "do", "explain", "for", "from", "give", "how", "in", "is",
+    "it", "its", "me", "of", "on", "or", "tell", "the", "to", "what", "when",
+    "where", "which", "who", "why", "with", "about", "please",
+}
+
+MIN_COVERAGE  = 0.6
+CANDIDATES    = 10
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(])")
+_TERM         = re.compile(r"[A-Za-z0-9]+")
+
+
+def summarize(text, sentences=2):
+    text  = " ".join(text.split())
+    parts = _SENTENCE_END.split(text)
+    return " ".join(parts[:sentences]).strip()
+
+
+def query_terms(question):
+    return [t for t in _TERM.findall(question.lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+# ══════════════════════════════════════════════
+# RUNTIME INDEX
+# ══════════════════════════════════════════════
+
+class Encyclopedia:
+    def __init__(self, path, min_coverage=MIN_COVERAGE):
+        self.path         = path
+        self.min_coverage = min_coverage
+        self._lock        = threading.Lock()
+        self._conn        = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+    def _matching(self, match, rowids):
+        """The rowids among `rowids` that satisfy the FTS5 query `match`."""
+        rows = self._conn.execute(
+            f"SELECT rowid FROM articles WHERE articles MATCH ? "
+            f"AND rowid IN ({','.join('?' * len(rowids))})",
+            (match, *rowids),
+        ).fetchall()
+        return {rowid for (rowid,) in rows}
+
+    def search(self, question, limit=1):
+        """
+        Relevant article summaries for `question`, best (BM25) first.
+        Candidates below min_coverage or without a term in their title are dropped.
+        """
+        terms = list(dict.fromkeys(query_terms(question)))
+        if not terms:
+            return []
+        match = " OR ".join(f'"{t}"' for t in terms)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rowid, title, summary FROM articles WHERE articles MATCH ? "
+                "ORDER BY bm25(articles, 10.0, 1.0) LIMIT ?",
+                (match, max(limit, CANDIDATES)),
+            ).fetchall()
+            if not rows:
+                return []
+            rowids  = [row[0] for row in rows]
+            titled  = self._matching(f"title : ({match})", rowids)
+            covered = {rowid: 0 for rowid in rowids}
+            for term in terms:
+                for rowid in self._matching(f'"{term}"', rowids):
+                    covered[rowid] += 1
+        return [
+            {"title": title, "summary": summary}
+            for rowid, title, summary in rows
+            if rowid in titled and covered[rowid] / len(terms) >= self.min_coverage
+        ][:limit]
+
+    def lookup(self, question):
+        hits = self.search(question)
+        return hits[0]["summary"] if hits else None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+
+def open_encyclopedia(path, min_coverage=MIN_COVERAGE):
+    """The index at `path`, or None when it has not been built."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        index = Encyclopedia(path, min_coverage)
+        print(f"[Encyclopedia] {len(index)} articles loaded from {path}.")
+        return index
+    except sqlite3.Error as e:
+        print(f"[Encyclopedia] Could not open {path}: {e}")
+        return None
+
+
+# ══════════════════════════════════════════════
+# IMPORTER
+# ══════════════════════════════════════════════
+
+def _clean_wikitext(text):
+    text = re.sub(r"<ref[^>]*/>|<ref[^>]*>.*?</ref>", "", text, flags=re.DOTALL)
+    for _ in range(3):                                     # nested templates
+        text = re.sub(r"\{\{[^{}]*\}\}", "", text)
+    text = re.sub(r"\{\|.*?\|\}", "", text, flags=re.DOTALL)  # tables
+    text = re.sub(r"\[\[(?:File|Image|Category):[^\]]*\]\]", "", text)
+    text = re.sub(r"\[\[(?:[^|\]]*\|)?([^\]]+)\]\]", r"\1", text)
+    text = re.sub(r"\[https?://\S+ ([^\]]+)\]", r"\1", text)
+    text = re.sub(r"'{2,}", "", text)
+    text = re.sub(r"<[^>]+>", "", text)
+    text = re.sub(r"^=+.*?=+\s*$", "", text, flags=re.MULTILINE)
+    return text.strip()
+
+
+def _iter_folder(folder):
+    for root, _, files in os.walk(folder):
+        for name in sorted(files):
+            if not name.endswith((".txt", ".md")):
+                continue
+            with open(os.path.join(root, name), encoding="utf-8") as f:
+                text = f.read()
+            lines = text.strip().splitlines()
+            if lines and lines[0].startswith("#"):
+                title, text = lines[0].lstrip("# ").strip(), "\n".join(lines[1:])
+            else:
+                title = os.path.splitext(name)[0].replace("_", " ")
+            yield title, text
+
+
+def _iter_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                yield item["title"], item.get("text") or item.get("body", "")
+
+
+def _iter_dump(path, keywords):
+    wanted = re.compile(r"\b(?:" + "|".join(map(re.escape, keywords)) + ")")
+    opener = bz2.open if path.endswith(".bz2") else open
+    with opener(path, "rb") as f:
+        title = None
+        for _, elem in ET.iterparse(f, events=("end",)):
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if tag == "title":
+                title = elem.text
+            elif tag == "text" and title:
+                raw = elem.text or ""
+                if not raw.lower().startswith("#redirect"):
+                    text = _clean_wikitext(raw)
+                    head = text[:2000].lower()
+                    if text and wanted.search(head):
+                        yield title, text
+            elif tag == "page":
+                title = None
+                elem.clear()
+
+
+def iter_articles(source, keywords=DEFAULT_KEYWORDS):
+    if os.path.isdir(source):
+        return _iter_folder(source)
+    if source.endswith(".jsonl"):
+        return _iter_jsonl(source)
+    if source.endswith((".xml", ".xml.bz2")):
+        return _iter_dump(source, keywords)
+    raise ValueError(f"don't know how to import '{source}' (folder, .jsonl, .xml or .xml.bz2)")
+
+
+def build_index(path, sources, keywords=DEFAULT_KEYWORDS):
+    """Build a fresh index from `sources` and swap it in atomically."""
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.execute(
+        "CREATE VIRTUAL TABLE articles USING fts5("
+        "title, body, summary UNINDEXED, tokenize='porter unicode61')"
+    )
+    imported = 0
+    for source in sources:
+        for title, text in iter_articles(source, keywords):
+            summary = summarize(text)
+            if len(summary) < 30:
+                continue
+            conn.execute(
+                "INSERT INTO articles (title, body, summary) VALUES (?, ?, ?)",
+                (title, text, summary),
+            )
+            imported += 1
+            if imported % 1000 == 0:
+                conn.commit()
+                print(f"[Encyclopedia] {imported} articles...")
+    conn.commit()
+    conn.execute("INSERT INTO articles(articles) VALUES ('optimize')")
+    conn.commit()
+    conn.close()
+    os.replace(tmp_path, path)
+    print(f"[Encyclopedia] Imported {imported} articles into {path}.")
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline chemistry encyclopedia (SQLite FTS5).")
+    parser.add_argument("--index", default="encyclopedia.sqlite3")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="(re)build the index from folders, .jsonl files or Wikipedia dumps")
+    imp.add_argument("sources", nargs="+")
+    imp.add_argument("--keywords", default=",".join(DEFAULT_KEYWORDS),
+                     help="dump pages are kept only if their opening mentions one of these")
+
+    search = sub.add_parser("search", help="query the index")
+    search.add_argument("question")
+    search.add_argument("--limit", type=int, default=3)
+
+    args = parser.parse_args()
+    if args.command == "import":
+        keywords = [k.strip().lower() for k in args.keywords.split(",") if k.strip()]
+        build_index(args.index, args.sources, keywords)
+    else:
+        index = open_encyclopedia(args.index)
+        if index is None:
+            raise SystemExit(f"No index at {args.index} — run 'python encyclopedia.py import' first.")
+        for hit in index.search(args.question, args.limit):
+            print(f"## {hit['title']}\n{hit['summary']}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""localization.py — Precompiled per-language quiz bank and answer templates
+KIET University · JNTU Kakinada
+--------------------------------------
+QUIZ_BANK and the fixed answer templates in model.py (element cards,
+molar-mass steps, structure and quiz messages) are static English text.
+Instead of translating them on every non-English request, they are
+translated once by
+
+    python localization.py build                 # default languages
+    python localization.py build --languages te,hi
+
+which writes one artifact per language to locales/<lang>.json plus
+locales/manifest.json.  Every artifact records the version (hash) of the
+English sources it was built from; the runtime Localizer loads an
+artifact lazily on the first request in that language and ignores it
+once the English sources change, so a stale build can never serve
+outdated questions.  A language is only written when every string came
+back translated; otherwise its previous artifact (if any) is left alone
+and requests keep falling back to runtime translation.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import string
+import threading
+from datetime import datetime
+
+DEFAULT_LANGUAGES = ["te", "hi", "ta", "kn", "fr", "de", "es", "zh", "ja", "ar"]
+
+_OPTION = re.compile(r"^([A-Z]\)\s*)(.*)$", re.DOTALL)
+
+
+def source_version(sources):
+    data = json.dumps(sources, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+def _placeholders(template):
+    return {name for _, name, _, _ in string.Formatter().parse(template) if name}
+
+
+# ══════════════════════════════════════════════
+# RUNTIME LOADER
+# ══════════════════════════════════════════════
+
+class Localizer:
+    def __init__(self, folder, version):
+        self.folder   = folder
+        self.version  = version
+        self._lock    = threading.Lock()
+        self._loaded  = {}            # language → artifact dict, or None if unusable
+
+    def _load(self, language):
+        path = os.path.join(self.folder, f"{language}.json")
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                artifact = json.load(f)
+        except Exception as e:
+            print(f"[Localization] Could not load {path}: {e}")
+            return None
+        if artifact.get("version") != self.version:
+            print(f"[Localization] {path} is stale — run 'python localization.py build'.")
+            return None
+        print(f"[Localization] Loaded {path}.")
+        return artifact
+
+    def get(self, language):
+        if not language or language == "en":
+            return None
+        with self._lock:
+            if language not in self._loaded:
+                self._loaded[language] = self._load(language)
+            return self._loaded[language]
+
+    def available(self, language):
+        return self.get(language) is not None
+
+    def template(self, name, language, default):
+        artifact = self.get(language)
+        if artifact is None:
+            return default
+        return artifact["templates"].get(name, default)
+
+    def string(self, text, language):
+        artifact = self.get(language)
+        if artifact is None:
+            return text
+        return artifact["strings"].get(text, text)
+
+    def quiz_bank(self, language):
+        artifact = self.get(language)
+        return artifact["quiz_bank"] if artifact else None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "version":  self.version,
+                "loaded":   sorted(lang for lang, a in self._loaded.items() if a),
+                "missing":  sorted(lang for lang, a in self._loaded.items() if not a),
+            }
+
+
+# ══════════════════════════════════════════════
+# BUILD STEP
+# ══════════════════════════════════════════════
+
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def build_language(sources, language, translate_fields):
+    """
+    Translate every English source string into `language` in one batch.
+    Returns None when any string could not be translated.
+    """
+    fields = {}
+    for name, text in sources["templates"].items():
+        fields[f"template|{name}"] = text
+    for i, text in enumerate(sources["strings"]):
+        fields[f"string|{i}"] = text
+    for category, questions in sources["quiz_bank"].items():
+        for i, q in enumerate(questions):
+            fields[f"quiz|{category}|{i}|question"]    = q["question"]
+            fields[f"quiz|{category}|{i}|explanation"] = q["explanation"]
+            for j, option in enumerate(q["options"]):
+                # Translate "7 to 14", keep the "A) " label.
+                fields[f"quiz|{category}|{i}|option|{j}"] = _OPTION.match(option).group(2)
+
+    done, complete = translate_fields(fields, language)
+    if not complete:
+        print(f"[Localization] {language}: some strings were not translated — not writing an artifact.")
+        return None
+
+    templates = {}
+    for name, english in sources["templates"].items():
+        translated = done[f"template|{name}"]
+        if _placeholders(translated) != _placeholders(english):
+            print(f"[Localization] {language}: placeholders changed in '{name}' — keeping English.")
+            translated = english
+        templates[name] = translated
+
+    quiz_bank = {}
+    for category, questions in sources["quiz_bank"].items():
+        quiz_bank[category] = [
+            {
+                "question":    done[f"quiz|{category}|{i}|question"],
+                "options":     [
+                    _OPTION.match(option).group(1) + done[f"quiz|{category}|{i}|option|{j}"]
+                    for j, option in enumerate(q["options"])
+                ],
+                "answer":      q["answer"],
+                "explanation": done[f"quiz|{category}|{i}|explanation"],
+            }
+            for i, q in enumerate(questions)
+        ]
+
+    return {
+        "language":  language,
+        "templates": templates,
+        "strings":   {text: done[f"string|{i}"] for i, text in enumerate(sources["strings"])},
+        "quiz_bank": quiz_bank,
+    }
+
+
+def build_locales(languages, folder="locales"):
+    # Loading model.py gives us the English sources and translate pipeline;
+    # no inference workers are needed for that.
+    os.environ["CHEMAI_WORKERS"] = "0"
+    import model as chem
+
+    sources = chem.locale_sources()
+    version = source_version(sources)
+    os.makedirs(folder, exist_ok=True)
+
+    built, failed = [], []
+    for language in languages:
+        artifact = build_language(sources, language, chem.translate_fields)
+        if artifact is None:
+            failed.append(language)
+            continue
+        artifact["version"] = version
+        _write_json(os.path.join(folder, f"{language}.json"), artifact)
+        built.append(language)
+        print(f"[Localization] Wrote {folder}/{language}.json")
+
+    _write_json(os.path.join(folder, "manifest.json"), {
+        "version":   version,
+        "languages": sorted(built),
+        "built":     datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    })
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-translate the quiz bank and answer templates.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="write locales/<lang>.json artifacts")
+    build.add_argument("--languages", default=",".join(DEFAULT_LANGUAGES))
+    build.add_argument("--output", default="locales")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        languages = [lang.strip() for lang in args.languages.split(",") if lang.strip()]
+        failed = build_locales(languages, args.output)
+        if failed:
+            raise SystemExit(f"Translation incomplete for: {', '.join(failed)} — run the build again.")
+
+
+if __name__ == "__main__":
+    main()
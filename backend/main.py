@@ -6,35 +6,52 @@ KIET University · JNTU Kakinada
 Endpoints:
   GET  /              → Health check
   POST /predict       → FLAN-T5 Q&A
+  POST /predict/stream→ FLAN-T5 Q&A as Server-Sent Events
   GET  /history       → Query history (last 30)
   POST /structure     → RDKit molecular structure image
+  POST /structure/batch → many structures as a grid or per-compound images
+  GET  /structure/image/{key}.png → cached structure PNG (ETag)
   POST /pdf-analyze   → PDF/image analysis
   POST /translate     → Text translation
+  GET  /metrics       → Batching / cache counters
 """
 
 # ================================
 # IMPORTS
 # ================================
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, UploadFile, File, Form, Request
+from fastapi.concurrency import run_in_threadpool, iterate_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 
 from auth import router
-from schemas import Query
+from schemas import Query, StructureBatch
 from model import (
     generate_answer,
+    stream_answer,
     analyze_pdf_text,
     translate_text,
-    generate_structure_image
+    atranslate_fields,
+    generate_structure_image,
+    render_structure_batch,
+    render_cache,
+    STRUCTURE_BATCH_MAX,
+    needs_model,
+    get_metrics,
+    PDF_PIPELINE_PARAMS,
+    PDF_TEXT_BUDGET,
+    UncacheableAnswer,
 )
 from database import history_col
+from cancellation import CancellationToken
+from admission import AdmissionController, QueueFull
+from pdf_pipeline import open_pdf, iter_pdf_pages
+from cache import DocumentCache, SQLiteStore
 
 from datetime import datetime
 import os
-import tempfile
-import shutil
-import fitz  # PyMuPDF
+import json
+import asyncio
 
 
 # ================================
@@ -52,9 +69,75 @@ app.add_middleware(
 # Include auth routes
 app.include_router(router)
 
-# Static folder for molecular images
-os.makedirs("structures", exist_ok=True)
-app.mount("/structures", StaticFiles(directory="structures"), name="structures")
+# Per-request deadline for model generation (seconds)
+REQUEST_TIMEOUT = float(os.getenv("CHEMAI_REQUEST_TIMEOUT", "60"))
+
+# Admission control for model-backed requests (see admission.py)
+admission = AdmissionController(
+    concurrency=int(os.getenv("CHEMAI_MAX_CONCURRENT", "8")),
+    max_queue=int(os.getenv("CHEMAI_QUEUE_DEPTH", "32")),
+)
+
+# Upload and extraction limits for /pdf-analyze (see pdf_pipeline.py).  By
+# default no more text is extracted than the map-reduce chunks can hold.
+PDF_MAX_UPLOAD_MB = float(os.getenv("CHEMAI_PDF_MAX_UPLOAD_MB", "20"))
+PDF_MAX_PAGES     = int(os.getenv("CHEMAI_PDF_MAX_PAGES", "50"))
+PDF_MAX_BYTES     = int(os.getenv("CHEMAI_PDF_MAX_BYTES", str(PDF_TEXT_BUDGET)))
+
+# Content-addressed /pdf-analyze cache: extracted text and results per language
+pdf_cache = DocumentCache(SQLiteStore(
+    os.getenv("CHEMAI_PDF_CACHE_PATH", "cache/pdf_cache.sqlite3"),
+    table="documents",
+    max_entries=int(os.getenv("CHEMAI_PDF_CACHE_MAX_ENTRIES", "5000")),
+    ttl=None,
+    max_bytes=int(float(os.getenv("CHEMAI_PDF_CACHE_MAX_MB", "256")) * 1024 * 1024),
+), params=f"{PDF_PIPELINE_PARAMS};pages={PDF_MAX_PAGES};bytes={PDF_MAX_BYTES};text=2")
+# text=2: the text entry is {"pages", "extraction"}, no longer a bare page list.
+
+
+def cacheable_result(result):
+    # Timings describe the run that produced the result, not a cache hit.
+    return {key: value for key, value in result.items() if key != "timings"}
+
+
+def generation_failed(result):
+    # analyze_pdf_text() keeps a failed generation's UncacheableAnswer type.
+    return any(isinstance(value, UncacheableAnswer) for value in result.values())
+
+
+def busy_response(e: QueueFull):
+    return JSONResponse(
+        status_code=e.status_code,
+        content={"error": str(e), "retry_after": e.retry_after},
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+class ReleasingStreamingResponse(StreamingResponse):
+    """
+    Runs `on_close` once the response is over — including when the client
+    is gone before the body generator ever starts, so that a generator's
+    own `finally` would never run.
+    """
+
+    def __init__(self, content, on_close, **kwargs):
+        super().__init__(content, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.on_close()
+
+
+async def watch_disconnect(request: Request, token: CancellationToken):
+    """Cancel `token` as soon as the client goes away."""
+    while not token.cancelled:
+        if await request.is_disconnected():
+            token.cancel("disconnected")
+            return
+        await asyncio.sleep(0.5)
 
 
 # ================================
@@ -69,10 +152,14 @@ def root():
         "model": "FLAN-T5 Base + LoRA Adapter",
         "endpoints": {
             "predict":     "POST /predict",
+            "stream":      "POST /predict/stream",
             "history":     "GET /history",
             "structure":   "POST /structure",
+            "structure_batch": "POST /structure/batch",
+            "structure_image": "GET /structure/image/{key}.png",
             "pdf_analyze": "POST /pdf-analyze",
-            "translate":   "POST /translate"
+            "translate":   "POST /translate",
+            "metrics":     "GET /metrics"
         }
     }
 
@@ -81,7 +168,7 @@ def root():
 # 2. PREDICT — Q&A
 # ================================
 @app.post("/predict")
-def predict(q: Query):
+async def predict(q: Query, request: Request):
     if not q.text or not q.text.strip():
         return JSONResponse(
             status_code=400,
@@ -90,12 +177,33 @@ def predict(q: Query):
 
     language = getattr(q, "language", "en") or "en"
 
-    output = generate_answer(q.text.strip(), language=language)
+    text = q.text.strip()
 
-    # Save history
+    # Cheap deterministic routes never wait behind queued beam searches.
+    if not await run_in_threadpool(needs_model, text):
+        output = await run_in_threadpool(generate_answer, text, language)
+        await run_in_threadpool(save_query, q.text, output, language)
+        return {"output": output}
+
+    token   = CancellationToken(timeout=REQUEST_TIMEOUT)
+    watcher = asyncio.create_task(watch_disconnect(request, token))
+    try:
+        async with admission.slot("interactive"):
+            output = await run_in_threadpool(generate_answer, text, language, token)
+    except QueueFull as e:
+        return busy_response(e)
+    finally:
+        watcher.cancel()
+
+    await run_in_threadpool(save_query, q.text, output, language)
+
+    return {"output": output}
+
+
+def save_query(text, output, language):
     try:
         history_col.insert_one({
-            "input": q.text,
+            "input": text,
             "output": output,
             "language": language,
             "time": datetime.utcnow()
@@ -103,7 +211,49 @@ def predict(q: Query):
     except Exception as e:
         print(f"[MongoDB Error] {e}")
 
-    return {"output": output}
+
+# ================================
+# 2b. PREDICT — STREAMING (SSE)
+# ================================
+@app.post("/predict/stream")
+async def predict_stream(q: Query):
+    if not q.text or not q.text.strip():
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Question text is required."}
+        )
+
+    language = getattr(q, "language", "en") or "en"
+    text     = q.text.strip()
+    token    = CancellationToken(timeout=REQUEST_TIMEOUT)
+
+    admitted = await run_in_threadpool(needs_model, text)
+    if admitted:
+        try:
+            await admission.acquire("interactive")
+        except QueueFull as e:
+            return busy_response(e)
+
+    async def events():
+        async for event in iterate_in_threadpool(
+            stream_answer(text, language=language, cancel_token=token)
+        ):
+            if event["event"] == "final":
+                await run_in_threadpool(save_query, q.text, event["output"], language)
+            payload = json.dumps(event, ensure_ascii=False)
+            yield f"event: {event['event']}\ndata: {payload}\n\n"
+
+    def on_close():
+        token.cancel("disconnected")
+        if admitted:
+            admission.release()
+
+    return ReleasingStreamingResponse(
+        events(),
+        on_close,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 # ================================
@@ -140,29 +290,64 @@ def structure(q: Query):
         }
 
     compound = q.text.strip().lower()
-    file_path = generate_structure_image(compound)
+    image_key = generate_structure_image(compound)
 
-    if file_path is None:
+    if image_key is None:
         return {
             "image_url": None,
             "message": f"No structure available for '{compound}'."
         }
 
-    dest = f"structures/{os.path.basename(file_path)}"
+    return {
+        "image_url": f"/structure/image/{image_key}.png",
+        "message": f"✅ Structure of {compound.title()} generated."
+    }
 
-    if os.path.exists(file_path) and file_path != dest:
-        try:
-            os.rename(file_path, dest)
-        except Exception:
-            shutil.copy(file_path, dest)
-            os.remove(file_path)
+
+@app.post("/structure/batch")
+def structure_batch(body: StructureBatch):
+    items = [item.strip() for item in body.items if item and item.strip()]
+    if not items:
+        return JSONResponse(status_code=400, content={"error": "Please provide at least one compound."})
+    if len(items) > STRUCTURE_BATCH_MAX:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"At most {STRUCTURE_BATCH_MAX} compounds per request."}
+        )
+    if body.mode not in ("grid", "individual"):
+        return JSONResponse(status_code=400, content={"error": "mode must be 'grid' or 'individual'."})
+
+    result = render_structure_batch(items, body.mode, body.per_row or 4, body.style or "default")
+
+    def url(key):
+        return f"/structure/image/{key}.png" if key else None
 
     return {
-        "image_url": f"/structures/{os.path.basename(dest)}",
-        "message": f"✅ Structure of {compound.title()} generated."
+        "mode":      body.mode,
+        "image_url": url(result["grid_key"]),
+        "items": [
+            {"input": r["input"], "name": r["name"], "smiles": r["smiles"], "image_url": url(r["image_key"])}
+            for r in result["items"]
+        ],
+        "missing": [r["input"] for r in result["items"] if not r["smiles"]],
     }
 
 
+@app.get("/structure/image/{image_key}.png")
+def structure_image(image_key: str, request: Request):
+    # The key is derived from the render inputs (SMILES, size, style and
+    # renderer version), so the image behind a key never changes.
+    etag = f'"{image_key}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+
+    png = render_cache.get(image_key) if image_key.isalnum() else None
+    if png is None:
+        return JSONResponse(status_code=404, content={"error": "Unknown structure image."})
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=png, media_type="image/png", headers=headers)
+
+
 # ================================
 # 5. PDF ANALYZE
 # ================================
@@ -171,30 +356,37 @@ async def pdf_analyze(
     file: UploadFile = File(...),
     language: str = Form(default="en")
 ):
-    content = await file.read()
+    upload_limit = int(PDF_MAX_UPLOAD_MB * 1024 * 1024)
+    content  = await file.read(upload_limit + 1)
+    language = language or "en"
+    if len(content) > upload_limit:
+        return JSONResponse(
+            status_code=413,
+            content={"error": f"File is larger than {PDF_MAX_UPLOAD_MB:g} MB."}
+        )
+    extraction = None
 
     # -------- PDF --------
     if file.content_type == "application/pdf":
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-            tmp.write(content)
-            tmp_path = tmp.name
-
-        try:
-            doc = fitz.open(tmp_path)
-            text = ""
-
-            for page in doc:
-                text += page.get_text()
-
-            doc.close()
-
-        except Exception as e:
-            return {"error": f"PDF read error: {str(e)}"}
-
-        finally:
-            os.unlink(tmp_path)
-
-        if not text.strip():
+        digest = await run_in_threadpool(pdf_cache.digest, content)
+        cached = await run_in_threadpool(pdf_cache.get_result, digest, language)
+        if cached is not None:
+            return dict(cached, cached=True)
+
+        extracted = await run_in_threadpool(pdf_cache.get_text, digest)
+        if extracted is None:
+            extraction = {}
+            try:
+                pages = await run_in_threadpool(lambda: list(iter_pdf_pages(
+                    open_pdf(content), PDF_MAX_PAGES, PDF_MAX_BYTES, extraction
+                )))
+            except Exception as e:
+                return {"error": f"PDF read error: {str(e)}"}
+            extracted = {"pages": pages, "extraction": extraction}
+            await run_in_threadpool(pdf_cache.set_text, digest, extracted)
+        text, extraction = extracted["pages"], extracted["extraction"]
+
+        if not any(page.strip() for page in text):
             return {"error": "Empty or scanned PDF."}
 
     # -------- IMAGE --------
@@ -204,18 +396,44 @@ async def pdf_analyze(
 
         text = f"Explain chemistry topic: {name}"
 
+        # Only the file name reaches the model, so that is what is hashed.
+        digest = pdf_cache.digest(text.encode("utf-8"))
+        cached = await run_in_threadpool(pdf_cache.get_result, digest, language)
+        if cached is not None:
+            return dict(cached, cached=True)
+
     else:
         return {"error": "Unsupported file type."}
 
-    # AI processing
-    result = analyze_pdf_text(text[:2000])
+    # AI processing (the English result is shared by every language)
+    result = await run_in_threadpool(pdf_cache.get_result, digest, "en") if language != "en" else None
+    if result is None:
+        try:
+            async with admission.slot("bulk"):
+                result = await run_in_threadpool(analyze_pdf_text, text)
+        except QueueFull as e:
+            return busy_response(e)
+        if extraction:
+            # Pages past the limits were never read: say so instead of
+            # summarising the beginning as if it were the whole document.
+            result["pages_total"]    = extraction["pages_total"]
+            result["pages_analyzed"] = extraction["pages_read"]
+            result["truncated"]      = result["truncated"] or extraction["truncated"]
+        if not generation_failed(result):
+            await run_in_threadpool(pdf_cache.set_result, digest, "en", cacheable_result(result))
 
     # Translation
     if language != "en":
+        english, result = result, dict(result)
         try:
-            result["summary"] = translate_text(result["summary"], language)
-            result["quiz"] = translate_text(result["quiz"], language)
-            result["video_script"] = translate_text(result["video_script"], language)
+            translated, complete = await atranslate_fields(
+                {field: english[field] for field in ("summary", "quiz", "video_script")},
+                language,
+            )
+            result.update(translated)
+            # Lines whose translation failed stay in English; don't cache that.
+            if complete and not generation_failed(english):
+                await run_in_threadpool(pdf_cache.set_result, digest, language, cacheable_result(result))
         except Exception as e:
             print(f"[Translation Error] {e}")
 
@@ -234,3 +452,14 @@ def translate(q: Query):
 
     result = translate_text(q.text, lang)
     return {"output": result}
+
+
+# ================================
+# 7. METRICS
+# ================================
+@app.get("/metrics")
+def metrics():
+    data = get_metrics()
+    data["pdf_cache"] = pdf_cache.stats()
+    data["admission"] = admission.stats()
+    return data
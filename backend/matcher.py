@@ -0,0 +1,126 @@
+"""matcher.py — Aho-Corasick matcher for compound and element names
+KIET University · JNTU Kakinada
+--------------------------------------
+Routing used to scan every key of smiles_map and the periodic table with
+`name in question`, picking the first hit in dict order ("hydrogen"
+inside "hydrogen peroxide") and costing one pass per dictionary entry.
+
+Matcher compiles every term into one automaton at startup, so a question
+is scanned once whatever the dictionary size.
+
+  • find_all(text) — every whole-word occurrence of every term
+  • find(text)     — leftmost-longest, non-overlapping matches: "hydrogen
+                     peroxide" wins over the "hydrogen" inside it
+
+Terms are matched case-insensitively and runs of whitespace count as one
+space ("hydrogen\n  peroxide" matches "hydrogen peroxide"); start/end
+always index the original text.  A term may carry several values (e.g.
+"hydrogen" is both an element and a compound).
+"""
+
+from collections import deque
+from typing import NamedTuple
+
+
+class Match(NamedTuple):
+    start: int
+    end: int
+    term: str
+    values: tuple
+
+
+def _is_word_char(ch):
+    # Apostrophes count as word characters so "what's" doesn't yield "s".
+    return ch.isalnum() or ch in "'_"
+
+
+def _normalize(text):
+    """
+    Lowercase `text` and collapse whitespace runs to one space, the way
+    terms are normalised; offsets[k] is the index in `text` of the k-th
+    normalised character.
+    """
+    chars, offsets = [], []
+    for i, ch in enumerate(text):
+        if ch.isspace():
+            if chars and chars[-1] == " ":
+                continue
+            ch = " "
+        for low in ch.lower():             # "İ".lower() is two characters
+            chars.append(low)
+            offsets.append(i)
+    return "".join(chars), offsets
+
+
+class Matcher:
+    def __init__(self, terms):
+        """terms: iterable of (term, value) pairs."""
+        values = {}
+        for term, value in terms:
+            term = " ".join(term.lower().split())
+            if term:
+                values.setdefault(term, []).append(value)
+        self.terms  = list(values)
+        self.values = [tuple(values[t]) for t in self.terms]
+        self._build()
+
+    def _build(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out  = [[]]
+        for index, term in enumerate(self.terms):
+            state = 0
+            for ch in term:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text):
+        """Every whole-word match, ordered by start and then longest first."""
+        text, offsets = _normalize(text)
+        matches = []
+        state   = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for index in self._out[state]:
+                term  = self.terms[index]
+                start = i - len(term) + 1
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if i + 1 < len(text) and _is_word_char(text[i + 1]):
+                    continue
+                matches.append(Match(offsets[start], offsets[i] + 1, term, self.values[index]))
+        matches.sort(key=lambda m: (m.start, m.start - m.end))
+        return matches
+
+    def find(self, text):
+        """Leftmost-longest matches that do not overlap."""
+        chosen = []
+        end    = 0
+        for match in self.find_all(text):
+            if match.start >= end:
+                chosen.append(match)
+                end = match.end
+        return chosen
+
+    def __len__(self):
+        return len(self.terms)
@@ -13,17 +13,48 @@ v4.0 Changes:
 """
 
 import torch
+import numpy as np
 import re
 import json
+import hashlib
 import random
 import os
+import time
+import threading
+import asyncio
 import wikipedia
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from transformers import (
+    AutoTokenizer, AutoModelForSeq2SeqLM, TextIteratorStreamer
+)
+from concurrent.futures import (
+    CancelledError, TimeoutError as FutureTimeout, ProcessPoolExecutor, ThreadPoolExecutor
+)
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 from peft import PeftModel
 from datetime import datetime
-from googletrans import Translator
 from rdkit import Chem
-from rdkit.Chem import Draw
+from batching import MicroBatcher
+from cache import AnswerCache, MemoryStore, SQLiteStore, make_store, normalize_question
+from translation import TranslationMemory
+from translators import ResilientTranslator, CircuitBreaker, make_provider
+from localization import Localizer, source_version
+from singleflight import SingleFlight
+from semantic_cache import SemanticCache
+from compile_model import verify_manifest
+from precision import apply_precision, model_size_mb
+from onnx_backend import load_onnx_model
+import cancellation
+from worker_pool import WorkerPool, generate_batch, threads_per_worker, warm_up
+from pdf_pipeline import chunk_pages
+from wiki import WikiLookup
+from encyclopedia import open_encyclopedia
+from compound_db import open_compound_db
+from render_cache import RenderCache
+from matcher import Matcher
+from structure_render import (
+    STYLES as STRUCTURE_STYLES, RENDER_VERSION, render_png, render_grid_png, grid_spec,
+)
 
 # ══════════════════════════════════════════════════════════════════
 #  GOOGLE DRIVE — MODEL DOWNLOAD CONFIGURATION
@@ -40,6 +71,105 @@ DRIVE_FOLDER_URL = "https://drive.google.com/drive/folders/1d-JBh6k-ArhK1ltgs-lw
 DRIVE_FOLDER_ID = DRIVE_FOLDER_URL.split("/folders/")[1].split("?")[0]
 ADAPTER_PATH    = "MyFinetunedModel"   # local folder where adapter files will be saved
 BASE_MODEL      = "google/flan-t5-base"
+MERGED_PATH     = "MyFinetunedModel-merged"   # written by: python compile_model.py
+
+# Load the merged safetensors checkpoint when present (CHEMAI_USE_MERGED=0 disables).
+# CHEMAI_VERIFY_CHECKSUMS=1 re-hashes the checkpoint on every startup.
+USE_MERGED       = os.getenv("CHEMAI_USE_MERGED", "1") == "1"
+VERIFY_CHECKSUMS = os.getenv("CHEMAI_VERIFY_CHECKSUMS", "0") == "1"
+
+# Inference precision (see precision.py): "fp32", "bf16" or "int8"
+PRECISION = os.getenv("CHEMAI_PRECISION", "fp32")
+
+# Execution backend: "torch" (default) or "onnx" (see onnx_backend.py)
+BACKEND   = os.getenv("CHEMAI_BACKEND", "torch")
+ONNX_PATH = "MyFinetunedModel-onnx"   # written by: python onnx_backend.py export
+
+# Inference worker processes sharing one copy of the weights (see worker_pool.py);
+# 0 keeps generation in the server process.
+INFERENCE_WORKERS = int(os.getenv("CHEMAI_WORKERS", "0"))
+
+# Streamed answers (/predict/stream) generating at the same time; they run in
+# the server process, next to the batcher or the worker pool (see stream_ai).
+STREAM_CONCURRENCY = max(1, int(os.getenv("CHEMAI_STREAM_CONCURRENCY", "1")))
+
+# Micro-batching of concurrent generate_ai() calls (see batching.py)
+BATCH_MAX_WAIT_MS  = float(os.getenv("CHEMAI_BATCH_WAIT_MS", "10"))
+BATCH_MAX_SIZE     = int(os.getenv("CHEMAI_BATCH_MAX_SIZE", "8"))
+BATCH_BUCKET_WIDTH = int(os.getenv("CHEMAI_BATCH_BUCKET_WIDTH", "64"))
+
+# Two-level answer cache (see cache.py) — "memory" or "sqlite"
+CACHE_BACKEND     = os.getenv("CHEMAI_CACHE_BACKEND", "memory")
+CACHE_PATH        = os.getenv("CHEMAI_CACHE_PATH", "cache/chemai_cache.sqlite3")
+CACHE_MAX_ENTRIES = int(os.getenv("CHEMAI_CACHE_MAX_ENTRIES", "2048"))
+CACHE_TTL_SECONDS = int(os.getenv("CHEMAI_CACHE_TTL", "86400"))
+
+# Translation memory keyed on (text hash, language) (see translation.py);
+# an empty CHEMAI_TRANSLATION_CACHE_PATH keeps it in memory only.
+TRANSLATION_CACHE_PATH        = os.getenv("CHEMAI_TRANSLATION_CACHE_PATH", "cache/translations.sqlite3")
+TRANSLATION_CACHE_MAX_ENTRIES = int(os.getenv("CHEMAI_TRANSLATION_CACHE_MAX_ENTRIES", "50000"))
+TRANSLATION_CACHE_MAX_MB      = float(os.getenv("CHEMAI_TRANSLATION_CACHE_MAX_MB", "64"))
+TRANSLATION_CACHE_TTL         = int(os.getenv("CHEMAI_TRANSLATION_CACHE_TTL", str(30 * 86400)))
+TRANSLATION_CONCURRENCY       = int(os.getenv("CHEMAI_TRANSLATION_CONCURRENCY", "2"))
+
+# Translation provider (see translators.py): "google" or "stub" (offline, deterministic)
+TRANSLATOR              = os.getenv("CHEMAI_TRANSLATOR", "google")
+TRANSLATOR_TIMEOUT      = float(os.getenv("CHEMAI_TRANSLATOR_TIMEOUT", "5"))
+TRANSLATOR_FAILURES     = int(os.getenv("CHEMAI_TRANSLATOR_FAILURES", "5"))
+TRANSLATOR_RESET        = float(os.getenv("CHEMAI_TRANSLATOR_RESET", "30"))
+TRANSLATOR_STUB_LATENCY = float(os.getenv("CHEMAI_TRANSLATOR_STUB_LATENCY_MS", "0"))
+
+# Wikipedia fallback (see wiki.py): hard timeout, cache lifetime, and whether
+# to start the lookup alongside generation instead of after it
+WIKI_TIMEOUT     = float(os.getenv("CHEMAI_WIKI_TIMEOUT", "3"))
+WIKI_CACHE_TTL   = int(os.getenv("CHEMAI_WIKI_CACHE_TTL", str(7 * 86400)))
+WIKI_SPECULATIVE = os.getenv("CHEMAI_WIKI_SPECULATIVE", "0") == "1"
+
+# Structure render cache (see render_cache.py)
+STRUCTURE_CACHE_ENTRIES = int(os.getenv("CHEMAI_STRUCTURE_CACHE_ENTRIES", "256"))
+STRUCTURE_CACHE_PATH    = os.getenv("CHEMAI_STRUCTURE_CACHE_PATH", "cache/structures")
+STRUCTURE_SIZE          = (400, 300)
+
+# RDKit render processes (0 renders on the request thread) and batch limits
+STRUCTURE_WORKERS   = int(os.getenv("CHEMAI_STRUCTURE_WORKERS", str(os.cpu_count() or 1)))
+STRUCTURE_BATCH_MAX = int(os.getenv("CHEMAI_STRUCTURE_BATCH_MAX", "50"))
+STRUCTURE_GRID_CELL = (250, 200)
+
+# Offline encyclopedia queried before Wikipedia (see encyclopedia.py);
+# CHEMAI_WIKI_ONLINE=0 never calls the live API (air-gapped servers).
+ENCYCLOPEDIA_PATH         = os.getenv("CHEMAI_ENCYCLOPEDIA_PATH", "encyclopedia.sqlite3")
+ENCYCLOPEDIA_MIN_COVERAGE = float(os.getenv("CHEMAI_ENCYCLOPEDIA_MIN_COVERAGE", "0.6"))
+WIKI_ONLINE               = os.getenv("CHEMAI_WIKI_ONLINE", "1") == "1"
+
+# Offline name → SMILES synonym table behind smiles_map (see compound_db.py)
+COMPOUND_DB_PATH    = os.getenv("CHEMAI_COMPOUND_DB_PATH", "compounds.sqlite3")
+COMPOUND_DB_ENTRIES = int(os.getenv("CHEMAI_COMPOUND_CACHE_ENTRIES", "4096"))
+
+# Pre-translated quiz bank and answer templates (see localization.py)
+LOCALES_PATH = os.getenv("CHEMAI_LOCALES_PATH", "locales")
+
+# Semantic (paraphrase) cache over FLAN-T5 encoder embeddings (see semantic_cache.py)
+SEMANTIC_CACHE       = os.getenv("CHEMAI_SEMANTIC_CACHE", "0") == "1"
+SEMANTIC_THRESHOLD   = float(os.getenv("CHEMAI_SEMANTIC_THRESHOLD", "0.95"))
+SEMANTIC_MAX_ENTRIES = int(os.getenv("CHEMAI_SEMANTIC_MAX_ENTRIES", "5000"))
+SEMANTIC_INDEX_PATH  = os.getenv("CHEMAI_SEMANTIC_INDEX", "cache/semantic_index.npz")
+
+# Chunked map-reduce summarisation of long PDFs (see pdf_pipeline.py)
+PDF_CHUNK_TOKENS = int(os.getenv("CHEMAI_PDF_CHUNK_TOKENS", "400"))
+PDF_MAX_CHUNKS   = int(os.getenv("CHEMAI_PDF_MAX_CHUNKS", "16"))
+PDF_NOTE_TOKENS  = int(os.getenv("CHEMAI_PDF_NOTE_TOKENS", "120"))
+PDF_MAX_ROUNDS   = 3
+
+# Bytes of PDF text the chunks above can hold (English averages ~4-5 bytes
+# per token); main.py extracts no more than this by default, so nothing is
+# read and cached that the model would never see.
+PDF_TEXT_BUDGET  = PDF_MAX_CHUNKS * PDF_CHUNK_TOKENS * 6
+
+# Part of every /pdf-analyze cache key, so changing the pipeline invalidates results.
+PDF_PIPELINE_PARAMS = (
+    f"chunk={PDF_CHUNK_TOKENS};chunks={PDF_MAX_CHUNKS};"
+    f"notes={PDF_NOTE_TOKENS};rounds={PDF_MAX_ROUNDS};backend={BACKEND}"
+)
 
 
 # ──────────────────────────────────────────────────────────────────
@@ -113,28 +243,71 @@ def download_adapter_from_drive():
 # MODEL LOADING
 # ══════════════════════════════════════════════
 
-download_adapter_from_drive()   # ← downloads from Drive if not already local
+def load_merged_model():
+    """
+    Load the checkpoint written by compile_model.py.  safetensors maps the
+    file into memory, so no PEFT wrapper is rebuilt and nothing is downloaded.
+    """
+    print(f"[ChemAI] Loading merged checkpoint from '{MERGED_PATH}/' (memory-mapped safetensors)...")
+    tok = AutoTokenizer.from_pretrained(MERGED_PATH, local_files_only=True)
+    mdl = AutoModelForSeq2SeqLM.from_pretrained(
+        MERGED_PATH,
+        torch_dtype=torch.float32,
+        use_safetensors=True,
+        low_cpu_mem_usage=True,
+        local_files_only=True,
+    )
+    return tok, mdl
 
-print("[ChemAI] Loading FLAN-T5 base model...")
-tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL)
 
-base_model = AutoModelForSeq2SeqLM.from_pretrained(
-    BASE_MODEL,
-    torch_dtype=torch.float32,
-    device_map="cpu"
-)
+def load_adapter_model():
+    download_adapter_from_drive()   # ← downloads from Drive if not already local
 
-print("[ChemAI] Loading LoRA adapter from local folder...")
-model = PeftModel.from_pretrained(
-    base_model,
-    ADAPTER_PATH,
-    local_files_only=True
-)
+    print("[ChemAI] Loading FLAN-T5 base model...")
+    tok = AutoTokenizer.from_pretrained(BASE_MODEL)
 
-model.eval()
-print("[ChemAI] Model ready on CPU.")
+    base_model = AutoModelForSeq2SeqLM.from_pretrained(
+        BASE_MODEL,
+        torch_dtype=torch.float32,
+        device_map="cpu"
+    )
 
-translator = Translator()
+    print("[ChemAI] Loading LoRA adapter from local folder...")
+    mdl = PeftModel.from_pretrained(
+        base_model,
+        ADAPTER_PATH,
+        local_files_only=True
+    )
+    return tok, mdl
+
+
+if BACKEND == "onnx":
+    tokenizer, model = load_onnx_model(ONNX_PATH)
+    active_precision = "fp32"
+    print("[ChemAI] Model ready on CPU (ONNX Runtime).")
+else:
+    merged_ok, merged_reason = (False, "disabled")
+    if USE_MERGED:
+        merged_ok, merged_reason = verify_manifest(MERGED_PATH, full=VERIFY_CHECKSUMS)
+
+    if merged_ok:
+        tokenizer, model = load_merged_model()
+    else:
+        if USE_MERGED:
+            print(f"[ChemAI] No usable merged checkpoint ({merged_reason}) — "
+                  f"run 'python compile_model.py' once to speed up startup.")
+        tokenizer, model = load_adapter_model()
+
+    model.eval()
+    model, active_precision = apply_precision(model, PRECISION)
+    print(f"[ChemAI] Model ready on CPU ({active_precision}, {model_size_mb(model):.0f} MB of weights).")
+
+translator = ResilientTranslator(
+    make_provider(TRANSLATOR, stub_latency_ms=TRANSLATOR_STUB_LATENCY),
+    timeout=TRANSLATOR_TIMEOUT,
+    breaker=CircuitBreaker(TRANSLATOR_FAILURES, TRANSLATOR_RESET),
+)
+print(f"[ChemAI] Translator: {translator.provider.name} (timeout {TRANSLATOR_TIMEOUT:.0f}s).")
 
 # ══════════════════════════════════════════════
 # CHAT HISTORY
@@ -161,15 +334,156 @@ def save_history(q, a):
 # TRANSLATION
 # ══════════════════════════════════════════════
 
+translation_memory = TranslationMemory(
+    MemoryStore(max_entries=4096, ttl=TRANSLATION_CACHE_TTL),
+    SQLiteStore(
+        TRANSLATION_CACHE_PATH,
+        table="translations",
+        max_entries=TRANSLATION_CACHE_MAX_ENTRIES,
+        ttl=TRANSLATION_CACHE_TTL,
+        max_bytes=int(TRANSLATION_CACHE_MAX_MB * 1024 * 1024),
+    ) if TRANSLATION_CACHE_PATH else None,
+    namespace="" if TRANSLATOR == "google" else f"{TRANSLATOR}:",
+    concurrency=TRANSLATION_CONCURRENCY,
+)
+
+
+def translate_fields(fields, lang):
+    """
+    Translate every value of `fields` together, in one request where
+    possible.  Returns (fields, complete) — see TranslationMemory.
+    """
+    if not lang or lang == "en":
+        return dict(fields), True
+    return translation_memory.translate_fields(fields, lang, translator.translate)
+
+
+async def atranslate_fields(fields, lang):
+    return await asyncio.to_thread(translate_fields, fields, lang)
+
+
 def translate_text(text, lang):
-    try:
-        if not lang or lang == "en":
-            return text
-        result = translator.translate(text, dest=lang)
-        return result.text if result and result.text else text
-    except Exception as e:
-        print(f"[Translation Error] {e}")
+    """
+    `text` in `lang`.  A translation that kept some English lines (a
+    failed or skipped request) comes back as UncacheableAnswer, so the
+    answer cache serves it once and asks again next time.
+    """
+    if not text or not lang or lang == "en":
         return text
+    fields, complete = translate_fields({"text": text}, lang)
+    return fields["text"] if complete else UncacheableAnswer(fields["text"])
+
+
+# ══════════════════════════════════════════════
+# ANSWER CACHE
+# ══════════════════════════════════════════════
+
+answer_cache = AnswerCache(
+    make_store(CACHE_BACKEND, "answers_en", CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, CACHE_PATH),
+    make_store(CACHE_BACKEND, "answers_translated", CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS, CACHE_PATH),
+)
+
+
+class UncacheableAnswer(str):
+    """
+    Text that is served once but never cached: a model error, or an answer
+    built after the model produced nothing.  generate_ai() returns its
+    errors as this type; the answer built from them keeps it.
+    """
+
+
+def _keep_failure(decoded, answer):
+    return UncacheableAnswer(answer) if isinstance(decoded, UncacheableAnswer) else answer
+
+
+def _is_cacheable(answer):
+    return bool(answer) and not isinstance(answer, UncacheableAnswer)
+
+
+def _cacheable_unless_cancelled(cancel_token):
+    # Partial answers from a cancelled generation must never be cached.
+    if cancel_token is None:
+        return _is_cacheable
+    return lambda answer: _is_cacheable(answer) and not cancel_token.cancelled
+
+
+# Identical questions in flight at the same time share one generation.
+inflight = SingleFlight()
+
+
+def embed_question(text):
+    """Mean-pooled, L2-normalised FLAN-T5 encoder output for `text`."""
+    inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=128)
+    with torch.no_grad():
+        hidden = model.get_encoder()(**inputs).last_hidden_state
+    mask   = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+    pooled = ((hidden * mask).sum(dim=1) / mask.sum(dim=1))[0].float().numpy()
+    norm   = np.linalg.norm(pooled)
+    return pooled / norm if norm else pooled
+
+
+def _files_signature(folder):
+    """Name, size and mtime of every file in `folder`; changes with each new checkpoint."""
+    if not os.path.isdir(folder):
+        return ""
+    parts = []
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            parts.append(f"{name}:{stat.st_size}:{int(stat.st_mtime)}")
+    return ",".join(parts)
+
+
+def encoder_fingerprint():
+    """Identifies the encoder behind embed_question() (see semantic_cache.py)."""
+    if BACKEND == "onnx":
+        source = f"onnx:{ONNX_PATH}:{_files_signature(ONNX_PATH)}"
+    elif merged_ok:
+        source = f"merged:{MERGED_PATH}:{_files_signature(MERGED_PATH)}"
+    else:
+        source = f"adapter:{BASE_MODEL}:{ADAPTER_PATH}:{_files_signature(ADAPTER_PATH)}"
+    raw = f"{BACKEND}|{active_precision}|{source}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+semantic_cache = None
+if SEMANTIC_CACHE:
+    semantic_cache = SemanticCache(
+        embed_question,
+        threshold=SEMANTIC_THRESHOLD,
+        max_entries=SEMANTIC_MAX_ENTRIES,
+        path=SEMANTIC_INDEX_PATH,
+        fingerprint=encoder_fingerprint(),
+    )
+
+
+def _with_semantic_cache(route, question, compute, cancel_token=None):
+    """Serve a stored answer to a paraphrase of an earlier question."""
+    if semantic_cache is None:
+        return compute()
+    answer, vector = semantic_cache.lookup(route, question)
+    if answer is not None:
+        return answer
+    answer = compute()
+    if _cacheable_unless_cancelled(cancel_token)(answer):
+        semantic_cache.add(route, question, answer, vector)
+    return answer
+
+
+def _answer_once(route, question, language, compute, cancel_token=None):
+    """answer_cache.get_or_compute(), coalesced across concurrent callers."""
+    def run():
+        ans = answer_cache.get_or_compute(
+            route, question, language, compute, translate_text,
+            cacheable=_cacheable_unless_cancelled(cancel_token),
+        )
+        complete = cancel_token is None or not cancel_token.cancelled
+        return ans, complete
+
+    key = (route, normalize_question(question), language or "en")
+    ans, _ = inflight.do(key, run, reusable=lambda result: result[1], cancel_token=cancel_token)
+    return ans
 
 
 # ══════════════════════════════════════════════
@@ -283,6 +597,34 @@ smiles_map = {
 }
 
 
+# ══════════════════════════════════════════════
+# NAME MATCHER (compounds, elements, symbols)
+# ══════════════════════════════════════════════
+
+def _entity_terms():
+    for element, data in periodic_table.items():
+        yield element, ("element", element)
+        yield data["symbol"], ("symbol", element)
+    for compound in smiles_map:
+        yield compound, ("compound", compound)
+
+
+entity_matcher = Matcher(_entity_terms())
+
+
+compound_db = open_compound_db(COMPOUND_DB_PATH, COMPOUND_DB_ENTRIES)
+
+
+def find_entities(text, kind):
+    """Keys of `kind` named in `text`, longest match first among overlaps."""
+    return [
+        key
+        for match in entity_matcher.find(text)
+        for value_kind, key in match.values
+        if value_kind == kind
+    ]
+
+
 # ══════════════════════════════════════════════
 # v4.0 — EXPANDED QUIZ BANK (10 categories × 8 questions)
 # ══════════════════════════════════════════════
@@ -921,6 +1263,82 @@ QUIZ_BANK = {
 }
 
 
+# ══════════════════════════════════════════════
+# RESPONSE TEMPLATES
+# ══════════════════════════════════════════════
+
+# Fixed text of the deterministic routes.  Pre-translated per language by
+# `python localization.py build`; keep {placeholders} intact when editing.
+TEMPLATES = {
+    "element_card": (
+        "## {name} — Element Data\n\n"
+        "**Symbol:** {symbol}\n"
+        "**Atomic Number:** {atomic_number}\n"
+        "**Atomic Mass:** {atomic_mass} u\n"
+        "**Group:** {group}\n"
+        "**Period:** {period}\n"
+        "**Category:** {category}\n"
+    ),
+    "element_card_short": (
+        "## {name} — Element Data\n\n"
+        "**Symbol:** {symbol}\n"
+        "**Atomic Number:** {atomic_number}\n"
+        "**Atomic Mass:** {atomic_mass} u\n"
+        "**Category:** {category}\n"
+    ),
+    "molar_mass": (
+        "## Molar Mass of {formula}\n\n"
+        "**Result:** {mass} g/mol\n\n"
+        "## Step-by-Step Calculation\n\n"
+        "1. Identify each element and its subscript count in the formula\n"
+        "2. Look up the standard atomic mass (IUPAC values)\n"
+        "3. Multiply each element's atomic mass by its count\n"
+        "4. Sum all values\n\n"
+        "**Answer:** {mass} g/mol\n\n"
+        "## Key Fact\n\n"
+        "1 mole of {formula} = {mass} g and contains 6.022 × 10²³ formula units."
+    ),
+    "structure_ok": (
+        "✅ Molecular structure of **{compound}** generated.\n\n"
+        "**SMILES notation:** `{smiles}`\n\n"
+        "Use the Structure tab to view the 2D diagram."
+    ),
+    "structure_failed": "Could not render structure for {compound}. SMILES: {smiles}",
+    "quiz_empty":       "Could not generate quiz questions. Please try again with a different topic.",
+    "quiz_title":       "## Chemistry Quiz{topic_label}\n",
+    "quiz_subtitle":    "**{count} Questions · Multiple Choice**\n\n---\n",
+    "quiz_answer":      "\n✅ **Answer:** {answer})",
+    "quiz_explanation": "📖 **Explanation:** {explanation}\n",
+}
+
+
+def locale_sources():
+    """Everything localization.py pre-translates."""
+    categories = {data.get("category", "N/A").title() for data in periodic_table.values()}
+    return {
+        "templates": TEMPLATES,
+        "strings":   sorted(categories | {"N/A"}),
+        "quiz_bank": QUIZ_BANK,
+    }
+
+
+locales = Localizer(LOCALES_PATH, source_version(locale_sources()))
+
+
+def template(name, language="en"):
+    return locales.template(name, language, TEMPLATES[name])
+
+
+def localize(text, language="en"):
+    """
+    Text built from templates is already in `language` when a locale
+    artifact exists; otherwise it is translated at request time.
+    """
+    if not language or language == "en" or locales.available(language):
+        return text
+    return translate_text(text, language)
+
+
 # ══════════════════════════════════════════════
 # UTILITY FUNCTIONS
 # ══════════════════════════════════════════════
@@ -1011,31 +1429,27 @@ def is_direct_element_question(question):
     return False
 
 
-def periodic_lookup(question):
+def _element_card(name, element, data, language):
+    return template(name, language).format(
+        name=element.title(),
+        symbol=data['symbol'],
+        atomic_number=data['atomic_number'],
+        atomic_mass=data['atomic_mass'],
+        group=data.get('group', locales.string('N/A', language)),
+        period=data.get('period', locales.string('N/A', language)),
+        category=locales.string(data.get('category', 'N/A').title(), language),
+    )
+
+
+def periodic_lookup(question, language="en"):
+    """The element card in `language` when a locale artifact exists, else in English."""
     if not is_direct_element_question(question):
         return None
-    q = question.lower()
-    for element, data in periodic_table.items():
-        if element in q:
-            return (
-                f"## {element.title()} — Element Data\n\n"
-                f"**Symbol:** {data['symbol']}\n"
-                f"**Atomic Number:** {data['atomic_number']}\n"
-                f"**Atomic Mass:** {data['atomic_mass']} u\n"
-                f"**Group:** {data.get('group', 'N/A')}\n"
-                f"**Period:** {data.get('period', 'N/A')}\n"
-                f"**Category:** {data.get('category', 'N/A').title()}\n"
-            )
-    for element, data in periodic_table.items():
-        symbol = data['symbol'].lower()
-        if f" {symbol} " in f" {q} " or q.strip() == symbol:
-            return (
-                f"## {element.title()} — Element Data\n\n"
-                f"**Symbol:** {data['symbol']}\n"
-                f"**Atomic Number:** {data['atomic_number']}\n"
-                f"**Atomic Mass:** {data['atomic_mass']} u\n"
-                f"**Category:** {data.get('category', 'N/A').title()}\n"
-            )
+    matches = entity_matcher.find(question)
+    for name, kind in (("element_card", "element"), ("element_card_short", "symbol")):
+        elements = [key for m in matches for k, key in m.values if k == kind]
+        if elements:
+            return _element_card(name, elements[0], periodic_table[elements[0]], language)
     return None
 
 
@@ -1073,49 +1487,213 @@ def molar_mass(formula):
 # WIKIPEDIA FALLBACK
 # ══════════════════════════════════════════════
 
-def wikipedia_lookup(question):
+def _fetch_wikipedia(question):
+    # "Not found" is cached like a summary; network errors raise and are not.
     try:
         summary = wikipedia.summary(question, sentences=2, auto_suggest=True)
         if summary and len(summary) > 30:
-            return summary
+            return {"summary": summary, "resolved": None}
     except wikipedia.exceptions.DisambiguationError as e:
         try:
             summary = wikipedia.summary(e.options[0], sentences=2)
-            return summary
-        except Exception:
-            return None
-    except Exception:
+            return {"summary": summary, "resolved": e.options[0]}
+        except wikipedia.exceptions.WikipediaException:
+            return {"summary": None, "resolved": e.options[0]}
+    except wikipedia.exceptions.PageError:
+        pass
+    return {"summary": None, "resolved": None}
+
+
+wiki = WikiLookup(
+    _fetch_wikipedia,
+    make_store(CACHE_BACKEND, "wikipedia", CACHE_MAX_ENTRIES, WIKI_CACHE_TTL, CACHE_PATH),
+    timeout=WIKI_TIMEOUT,
+)
+
+
+encyclopedia = open_encyclopedia(ENCYCLOPEDIA_PATH, ENCYCLOPEDIA_MIN_COVERAGE)
+
+
+def _offline_lookup(question):
+    if encyclopedia is None:
+        return None
+    try:
+        return encyclopedia.lookup(question)
+    except Exception as e:
+        print(f"[Encyclopedia Error] {e}")
         return None
-    return None
+
+
+def wikipedia_lookup(question, wiki_pending=None):
+    """
+    The offline encyclopedia first; the live API (or the prefetch_wikipedia()
+    already running) only when that has nothing and CHEMAI_WIKI_ONLINE=1.
+    """
+    summary = _offline_lookup(question)
+    if summary:
+        if wiki_pending is not None:
+            wiki.discard(wiki_pending)
+        return summary
+    if wiki_pending is not None:
+        return wiki.result(wiki_pending)
+    return wiki.lookup(question) if WIKI_ONLINE else None
+
+
+def prefetch_wikipedia(question):
+    """Start the fallback lookup next to generation (CHEMAI_WIKI_SPECULATIVE=1)."""
+    if not (WIKI_SPECULATIVE and WIKI_ONLINE):
+        return None
+    if _offline_lookup(question):
+        return None
+    return wiki.prefetch(question)
 
 
 # ══════════════════════════════════════════════
 # MOLECULAR STRUCTURE IMAGE (RDKit)
 # ══════════════════════════════════════════════
 
-def generate_structure_image(compound_name):
+# Spawned (not forked) so workers import only structure_render.py, never
+# this module and its model.  Processes start on the first render.
+def _new_structure_pool():
+    return ProcessPoolExecutor(
+        max_workers=STRUCTURE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+structure_pool      = _new_structure_pool() if STRUCTURE_WORKERS > 0 else None
+structure_pool_lock = threading.Lock()
+# Fans a batch out so that every render process is kept busy.
+structure_fanout = ThreadPoolExecutor(
+    max_workers=max(2, STRUCTURE_WORKERS * 2), thread_name_prefix="chemai-structure"
+)
+
+
+def _in_structure_pool(render):
+    if structure_pool is None:
+        return render
+
+    def run(*args):
+        global structure_pool
+        pool = structure_pool
+        try:
+            return pool.submit(render, *args).result()
+        except BrokenProcessPool:
+            # A render process died (e.g. out of memory): replace the pool
+            # so later renders work; this one counts as a failure.
+            with structure_pool_lock:
+                if structure_pool is pool:
+                    print("[RDKit] Render pool broke — restarting it.")
+                    structure_pool = _new_structure_pool()
+            raise
+
+    return run
+
+
+render_cache = RenderCache(
+    _in_structure_pool(render_png), max_entries=STRUCTURE_CACHE_ENTRIES, folder=STRUCTURE_CACHE_PATH,
+    version=RENDER_VERSION,
+)
+
+
+def canonical_smiles(smiles):
+    mol = Chem.MolFromSmiles(smiles)
+    return Chem.MolToSmiles(mol) if mol is not None else None
+
+
+def resolve_smiles(compound_name):
+    """
+    (name, SMILES) for a compound name, or (name, None): smiles_map, then
+    the compound database, then a known name mentioned inside `compound_name`.
+    """
     name   = compound_name.lower().strip()
     smiles = smiles_map.get(name)
+    record = compound_db.lookup(name) if compound_db and not smiles else None
+    if record:
+        smiles = record["smiles"]
     if not smiles:
-        for key, val in smiles_map.items():
-            if key in name or name in key:
-                smiles = val
-                name   = key
-                break
-    if not smiles:
+        compounds = find_entities(name, "compound")
+        if compounds:
+            name, smiles = compounds[0], smiles_map[compounds[0]]
+    if not smiles and compound_db:
+        record = compound_db.find_in_text(name)
+        if record:
+            name, smiles = record["name"].lower(), record["smiles"]
+    return name, smiles
+
+
+def resolve_structure(item):
+    """
+    (name, SMILES) for a compound name or a SMILES string, or (item, None).
+    Exact names come first, so a name that also parses as SMILES (e.g.
+    "CO", "NO") resolves to the compound it names.
+    """
+    text = item.strip()
+    name = text.lower()
+    if name in smiles_map:
+        return name, smiles_map[name]
+    record = compound_db.lookup(name) if compound_db else None
+    if record:
+        return name, record["smiles"]
+    if canonical_smiles(text) is not None:
+        return text, text
+    return resolve_smiles(text)
+
+
+def render_smiles(smiles, size=STRUCTURE_SIZE, style="default"):
+    """Render key of the image for `smiles` (see render_cache.py), or None."""
+    canonical = canonical_smiles(smiles)
+    if canonical is None:
         return None
-    try:
-        mol = Chem.MolFromSmiles(smiles)
-        if mol is None:
-            return None
-        safe_name = re.sub(r'[^a-z0-9_]', '_', name)
-        file_path = f"{safe_name}.png"
-        img = Draw.MolToImage(mol, size=(400, 300))
-        img.save(file_path)
-        return file_path
-    except Exception as e:
-        print(f"[RDKit Error] {e}")
+    return render_cache.get_or_render(canonical, tuple(size), style)
+
+
+def generate_structure_image(compound_name, size=STRUCTURE_SIZE, style="default"):
+    """
+    Render key of the compound's structure image, or None.  The PNG is
+    served by GET /structure/image/<key>.png.
+    """
+    _, smiles = resolve_smiles(compound_name)
+    if not smiles:
         return None
+    return render_smiles(smiles, size, style)
+
+
+def render_structure_batch(items, mode="grid", per_row=4, style="default"):
+    """
+    Resolve and render many compounds at once.  mode="grid" returns one
+    worksheet image; mode="individual" one image per compound, rendered in
+    parallel by the render processes.  Both go through render_cache.
+    """
+    style   = style if style in STRUCTURE_STYLES else "default"
+    results = []
+    for item in items[:STRUCTURE_BATCH_MAX]:
+        name, smiles = resolve_structure(item)
+        canonical    = canonical_smiles(smiles) if smiles else None
+        results.append({"input": item, "name": name, "smiles": canonical, "image_key": None})
+    found = [r for r in results if r["smiles"]]
+
+    grid_key = None
+    if mode == "grid" and found:
+        spec = grid_spec(
+            [r["smiles"] for r in found],
+            [r["name"].title() if r["name"] in smiles_map else r["input"] for r in found],
+            min(max(1, int(per_row)), len(found)),
+        )
+        grid_key = render_cache.get_or_render(
+            spec, STRUCTURE_GRID_CELL, style, render=_in_structure_pool(render_grid_png)
+        )
+    elif found:
+        futures = [
+            structure_fanout.submit(render_cache.get_or_render, r["smiles"], STRUCTURE_SIZE, style)
+            for r in found
+        ]
+        for r, future in zip(found, futures):
+            try:
+                r["image_key"] = future.result()
+            except Exception as e:
+                print(f"[RDKit Error] {r['input']}: {e}")
+
+    return {"grid_key": grid_key, "items": results}
 
 
 # ══════════════════════════════════════════════
@@ -1200,11 +1778,12 @@ def detect_quiz_topic(topic_text):
 # v4.0 — QUIZ GENERATOR
 # ══════════════════════════════════════════════
 
-def generate_quiz(topic, num_questions=5):
+def generate_quiz(topic, num_questions=5, language="en"):
     num_questions = max(1, min(num_questions, 10))
+    bank = locales.quiz_bank(language) or QUIZ_BANK
 
     category = detect_quiz_topic(topic)
-    pool     = list(QUIZ_BANK.get(category, []))
+    pool     = list(bank.get(category, []))
 
     if len(pool) < num_questions:
         secondary_map = {
@@ -1215,9 +1794,9 @@ def generate_quiz(topic, num_questions=5):
             "electrochemistry": "oxidation",
         }
         secondary = secondary_map.get(category, "default")
-        pool = pool + list(QUIZ_BANK.get(secondary, []))
+        pool = pool + list(bank.get(secondary, []))
 
-    default_pool = list(QUIZ_BANK["default"])
+    default_pool = list(bank["default"])
     random.shuffle(pool)
     random.shuffle(default_pool)
 
@@ -1240,22 +1819,22 @@ def generate_quiz(topic, num_questions=5):
     return result
 
 
-def format_quiz_as_text(quiz_list, topic=""):
+def format_quiz_as_text(quiz_list, topic="", language="en"):
     if not quiz_list:
-        return "Could not generate quiz questions. Please try again with a different topic."
+        return template("quiz_empty", language)
 
     topic_label = f" — {topic.title()}" if topic else ""
     lines = [
-        f"## Chemistry Quiz{topic_label}\n",
-        f"**{len(quiz_list)} Questions · Multiple Choice**\n\n---\n"
+        template("quiz_title", language).format(topic_label=topic_label),
+        template("quiz_subtitle", language).format(count=len(quiz_list)),
     ]
 
     for q in quiz_list:
         lines.append(f"### Q{q['question_number']}. {q['question']}\n")
         for opt in q["options"]:
             lines.append(f"   {opt}")
-        lines.append(f"\n✅ **Answer:** {q['answer']})")
-        lines.append(f"📖 **Explanation:** {q['explanation']}\n")
+        lines.append(template("quiz_answer", language).format(answer=q['answer']))
+        lines.append(template("quiz_explanation", language).format(explanation=q['explanation']))
         lines.append("---")
 
     lines.append("\n```json:quiz")
@@ -1335,30 +1914,181 @@ def _clean_question(question):
 # AI CORE — FLAN-T5 + LoRA GENERATION
 # ══════════════════════════════════════════════
 
-def generate_ai(prompt, max_new_tokens=300):
-    try:
-        inputs = tokenizer(
-            prompt,
-            return_tensors="pt",
-            truncation=True,
-            max_length=512
+GENERATION_KWARGS = dict(
+    num_beams=4,
+    no_repeat_ngram_size=4,
+    repetition_penalty=2.0,
+    length_penalty=1.2,
+    early_stopping=True,
+    temperature=0.7,
+)
+
+
+def _clean_batch(decoded, prompts):
+    return [clean_output(d, p) for d, p in zip(decoded, prompts)]
+
+
+def _generate_batch(prompts, max_new_tokens=300, cancel_tokens=None):
+    """max_new_tokens is one limit for all prompts, or a list with one per prompt."""
+    decoded = generate_batch(model, tokenizer, prompts, max_new_tokens, GENERATION_KWARGS, cancel_tokens)
+    return _clean_batch(decoded, prompts)
+
+
+def _prompt_length(prompt):
+    return len(tokenizer.encode(prompt, truncation=True, max_length=512))
+
+
+# Workers are spawned (see worker_pool.py), so it doesn't matter which
+# server threads (MongoDB client, executors) are already running.
+# Streams generate in the server process, so the cores are shared by the
+# workers and the stream slots: each gets cores / (workers + streams)
+# torch threads and together they never oversubscribe the CPU.
+worker_pool = None
+if INFERENCE_WORKERS > 0:
+    if BACKEND == "torch":
+        if active_precision == "int8":
+            print(f"[ChemAI] int8 weights can't be shared: each of the {INFERENCE_WORKERS} "
+                  f"workers loads its own copy.")
+        _threads = threads_per_worker(INFERENCE_WORKERS + STREAM_CONCURRENCY)
+        torch.set_num_threads(_threads)
+        worker_pool = WorkerPool(
+            model, tokenizer, GENERATION_KWARGS, INFERENCE_WORKERS,
+            threads=_threads, postprocess=_clean_batch,
         )
-        with torch.no_grad():
-            outputs = model.generate(
-                **inputs,
-                max_new_tokens=max_new_tokens,
-                num_beams=4,
-                no_repeat_ngram_size=4,
-                repetition_penalty=2.0,
-                length_penalty=1.2,
-                early_stopping=True,
-                temperature=0.7,
-            )
-        decoded = tokenizer.decode(outputs[0], skip_special_tokens=True)
-        return clean_output(decoded, prompt)
+        warm_up(worker_pool)
+    else:
+        print("[ChemAI] CHEMAI_WORKERS needs the torch backend — generating in-process.")
+
+batcher = MicroBatcher(
+    worker_pool.run_batch if worker_pool else _generate_batch,
+    measure=_prompt_length,
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+    bucket_width=BATCH_BUCKET_WIDTH,
+    on_cancel=cancellation.stats.record,
+    concurrency=worker_pool.workers if worker_pool else 1,
+)
+
+# After a deadline passes, how long to wait for the partial output of a
+# batch that is being stopped.
+CANCEL_GRACE_SECONDS = 0.5
+
+
+def generate_ai(prompt, max_new_tokens=300, cancel_token=None):
+    """
+    With a cancel_token, returns the partial output decoded so far ("" if
+    nothing was decoded) once the token is cancelled or its deadline passes.
+    """
+    try:
+        future = batcher.submit(prompt, max_new_tokens, cancel_token)
+        if cancel_token is None:
+            return future.result()
+        try:
+            return future.result(timeout=cancel_token.remaining())
+        except FutureTimeout:
+            cancel_token.cancel("deadline")
+            return future.result(timeout=CANCEL_GRACE_SECONDS)
+    except (CancelledError, FutureTimeout):
+        return ""
+    except Exception as e:
+        print(f"[Model Error] {e}")
+        return UncacheableAnswer(f"Model error: {str(e)}. Please check if FLAN-T5 is loaded correctly.")
+
+
+def generate_ai_batch(prompts, per_prompt_max_tokens=300, cancel_token=None):
+    """
+    Generate several prompts in ONE padded model.generate() pass.
+    Returns (outputs, timings); each prompt's "seconds" is its share of the
+    pass, apportioned by the number of tokens it generated.
+    """
+    if isinstance(per_prompt_max_tokens, int):
+        limits = [per_prompt_max_tokens] * len(prompts)
+    else:
+        limits = list(per_prompt_max_tokens)
+
+    start = time.perf_counter()
+    try:
+        outputs = batcher.submit_group(prompts, limits, cancel_token).result()
     except Exception as e:
         print(f"[Model Error] {e}")
-        return f"Model error: {str(e)}. Please check if FLAN-T5 is loaded correctly."
+        outputs = [UncacheableAnswer(f"Model error: {str(e)}. Please check if FLAN-T5 is loaded correctly.")] * len(prompts)
+    elapsed = time.perf_counter() - start
+
+    counts = [max(1, len(tokenizer.encode(o, add_special_tokens=False))) for o in outputs]
+    total  = sum(counts)
+    timings = {
+        "batch_seconds": round(elapsed, 3),
+        "prompts": [
+            {"max_new_tokens": limit, "output_tokens": count, "seconds": round(elapsed * count / total, 3)}
+            for limit, count in zip(limits, counts)
+        ],
+    }
+    return outputs, timings
+
+
+# Beam search cannot emit tokens before it finishes, so streaming uses
+# greedy decoding with the same repetition controls.
+STREAMING_KWARGS = dict(
+    num_beams=1,
+    do_sample=False,
+    no_repeat_ngram_size=4,
+    repetition_penalty=2.0,
+)
+
+# model.generate() calls for streams bypass the micro-batcher, so they are
+# bounded here; torch's thread count is per process, so in pool mode the
+# budget above is what keeps streams and workers within the CPU.
+stream_slots = threading.BoundedSemaphore(STREAM_CONCURRENCY)
+
+
+def _acquire_stream_slot(cancel_token):
+    while not stream_slots.acquire(timeout=0.1):
+        if cancel_token is not None and cancel_token.cancelled:
+            return False
+    return True
+
+
+def stream_ai(prompt, max_new_tokens=300, cancel_token=None):
+    """
+    Yield decoded text pieces while model.generate runs on a worker thread,
+    at most STREAM_CONCURRENCY at a time.  Nothing is yielded if the request
+    is cancelled while it waits for a slot.
+    """
+    if not _acquire_stream_slot(cancel_token):
+        return
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+    errors   = []
+
+    def run():
+        try:
+            inputs = tokenizer(
+                prompt,
+                return_tensors="pt",
+                truncation=True,
+                max_length=512
+            )
+            with torch.no_grad():
+                model.generate(
+                    **inputs,
+                    max_new_tokens=max_new_tokens,
+                    streamer=streamer,
+                    stopping_criteria=cancellation.stopping_criteria([cancel_token], max_new_tokens),
+                    **STREAMING_KWARGS,
+                )
+        except Exception as e:
+            errors.append(e)
+            streamer.end()
+        finally:
+            stream_slots.release()
+
+    worker = threading.Thread(target=run, name="chemai-stream", daemon=True)
+    worker.start()
+    for piece in streamer:
+        if piece:
+            yield piece
+    worker.join()
+    if errors:
+        raise errors[0]
 
 
 # ══════════════════════════════════════════════
@@ -1401,8 +2131,73 @@ Be specific. Use chemical symbols. Keep each point to 1-2 sentences."""
 # PDF ANALYSIS
 # ══════════════════════════════════════════════
 
+def _count_tokens(text):
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def _map_chunks(chunks):
+    """Map step: condense each chunk into short notes, BATCH_MAX_SIZE chunks per pass."""
+    notes, batches, seconds = [], 0, 0.0
+    for start in range(0, len(chunks), BATCH_MAX_SIZE):
+        prompts = [
+            "List the key chemistry facts in this text as short notes:\n" + chunk
+            for chunk in chunks[start:start + BATCH_MAX_SIZE]
+        ]
+        outputs, timings = generate_ai_batch(prompts, PDF_NOTE_TOKENS)
+        # A failed generation is an error message, not notes about the document.
+        notes.extend(o for o in outputs if o.strip() and not isinstance(o, UncacheableAnswer))
+        batches += 1
+        seconds += timings["batch_seconds"]
+    return notes, batches, seconds
+
+
+def _fit_chunks(chunks):
+    """
+    Final reduce once PDF_MAX_ROUNDS is used up: every chunk keeps an
+    equal share of PDF_CHUNK_TOKENS, so the end of the document is not
+    dropped in favour of its beginning.
+    """
+    share = max(1, PDF_CHUNK_TOKENS // len(chunks))
+    return "\n\n".join(
+        tokenizer.decode(tokenizer.encode(chunk, add_special_tokens=False)[:share],
+                         skip_special_tokens=True)
+        for chunk in chunks
+    )
+
+
+def _reduce_chunks(chunks):
+    """
+    Reduce step: map the chunks to notes and re-chunk the merged notes
+    until they fit in a single chunk.
+    """
+    stats = {"chunks": len(chunks), "rounds": 0, "batches": 0, "seconds": 0.0, "forced": False}
+    while len(chunks) > 1 and stats["rounds"] < PDF_MAX_ROUNDS:
+        notes, batches, seconds = _map_chunks(chunks)
+        stats["rounds"]  += 1
+        stats["batches"] += batches
+        stats["seconds"]  = round(stats["seconds"] + seconds, 3)
+        if not notes:
+            break                          # every generation failed: keep the text we have
+        chunks = list(chunk_pages(["\n\n".join(notes)], _count_tokens, PDF_CHUNK_TOKENS))
+    if len(chunks) > 1:
+        stats["forced"] = True
+        return _fit_chunks(chunks), stats
+    return (chunks[0] if chunks else ""), stats
+
+
 def analyze_pdf_text(text):
-    text = text[:1500].strip()
+    """
+    `text` is a string or a list of page texts.  Long documents are split
+    into token-sized chunks that are condensed (map) and merged (reduce)
+    before the summary and video script are written.  "truncated" is True
+    when the text was longer than PDF_MAX_CHUNKS chunks.
+    """
+    pages     = [text] if isinstance(text, str) else text
+    chunks    = list(chunk_pages(pages, _count_tokens, PDF_CHUNK_TOKENS, PDF_MAX_CHUNKS + 1))
+    truncated = len(chunks) > PDF_MAX_CHUNKS
+    chunks    = chunks[:PDF_MAX_CHUNKS]
+    topic     = chunks[0][:300] if chunks else ""
+    text, map_reduce = _reduce_chunks(chunks)
 
     summary_prompt = (
         "Summarize the following chemistry text into numbered study notes:\n"
@@ -1414,23 +2209,114 @@ def analyze_pdf_text(text):
         "[CONCLUSION] sections for this chemistry topic:\n" + text
     )
 
-    summary      = generate_ai(summary_prompt)
-    video_script = generate_ai(video_prompt)
-    quiz_list    = generate_quiz(topic=text[:300], num_questions=5)
+    (summary, video_script), timings = generate_ai_batch(
+        [summary_prompt, video_prompt], per_prompt_max_tokens=[300, 300]
+    )
+    timings["summary"]      = timings["prompts"][0]
+    timings["video_script"] = timings["prompts"][1]
+    del timings["prompts"]
+    timings["map_reduce"] = map_reduce
+
+    quiz_list    = generate_quiz(topic=topic, num_questions=5)
     quiz_text    = format_quiz_as_text(quiz_list)
 
     return {
-        "summary":      clean_output(summary),
+        "summary":      _keep_failure(summary, clean_output(summary)),
         "quiz":         quiz_text,
-        "video_script": clean_output(video_script),
+        "video_script": _keep_failure(video_script, clean_output(video_script)),
+        "truncated":    truncated,
+        "timings":      timings,
     }
 
 
+# ══════════════════════════════════════════════
+# ROUTING HELPERS
+# ══════════════════════════════════════════════
+
+def _find_structure_compound(q_lower):
+    if any(kw in q_lower for kw in ["structure", "draw", "molecule", "smiles"]):
+        compounds = find_entities(q_lower, "compound")
+        if compounds:
+            return compounds[0]
+        record = compound_db.find_in_text(q_lower) if compound_db else None
+        if record:
+            return record["name"].lower()
+    return None
+
+
+def classify_route(text):
+    """
+    Name the branch of generate_answer() that will serve `text` without
+    running it.  Only "important", "pdf" and "ai" need the model.
+    """
+    q       = text.strip()
+    q_lower = q.lower()
+    if q_lower.startswith("quiz:"):
+        return "quiz"
+    if q_lower.startswith("important:"):
+        return "important"
+    if _find_structure_compound(q_lower):
+        return "structure"
+    if periodic_lookup(q):
+        return "periodic"
+    if any(kw in q_lower for kw in ["molar mass", "molecular mass", "molecular weight", "atomic mass of"]):
+        formula = extract_formula(q)
+        if formula and molar_mass(formula):
+            return "molar_mass"
+    if q.startswith("PDF:"):
+        return "pdf"
+    return "ai"
+
+
+MODEL_ROUTES = ("important", "pdf", "ai")
+
+
+def needs_model(text):
+    """True when generate_answer(text) will run model generation."""
+    q     = text.strip()
+    route = classify_route(q)
+    if route not in MODEL_ROUTES:
+        return False
+    if route == "important":
+        key_q = _clean_question(q)
+    elif route == "pdf":
+        key_q = q.replace("PDF:", "").strip()
+    else:
+        key_q = q
+    return not answer_cache.contains(route, key_q)
+
+
+def _finish_ai_answer(decoded, question, cancel_token=None, wiki_pending=None):
+    """wiki_pending is the prefetch_wikipedia() started with the generation, if any."""
+    needs_fallback = len(decoded.split()) < 20
+    failed         = isinstance(decoded, UncacheableAnswer) or not decoded.strip()
+
+    # Nobody is waiting for a disconnected client — skip the fallback.
+    if cancel_token is not None and cancel_token.reason == "disconnected":
+        needs_fallback = False
+
+    if wiki_pending is not None and not needs_fallback:
+        wiki.discard(wiki_pending)
+
+    # ── 7. WIKIPEDIA FALLBACK ─────────────────────────────────────
+    if needs_fallback:
+        summary = wikipedia_lookup(question, wiki_pending)
+        if summary and len(summary) > 50:
+            decoded, failed = summary, False
+    answer = format_pointwise_answer(decoded, question) or clean_output(decoded)
+    return UncacheableAnswer(answer) if failed else answer
+
+
 # ══════════════════════════════════════════════
 # MAIN GENERATE ANSWER FUNCTION  (v4.0)
 # ══════════════════════════════════════════════
 
-def generate_answer(text, language="en"):
+def generate_answer(text, language="en", cancel_token=None):
+    """
+    cancel_token (see cancellation.py) stops model generation when the
+    client disconnects or the request deadline passes; the answer is then
+    built from the partial output or the Wikipedia fallback.
+    """
     q = text.strip()
     if not q:
         return "Please enter a chemistry question."
@@ -1447,43 +2333,51 @@ def generate_answer(text, language="en"):
         else:
             num_q = 5
             topic = raw
-        quiz_list = generate_quiz(topic=topic, num_questions=num_q)
-        ans = format_quiz_as_text(quiz_list, topic=topic)
-        ans = translate_text(ans, language)
+        quiz_list = generate_quiz(topic=topic, num_questions=num_q, language=language)
+        ans = format_quiz_as_text(quiz_list, topic=topic, language=language)
+        ans = localize(ans, language)
         save_history(q, ans)
         return ans
 
     # ── 1. IMPORTANT PREFIX ───────────────────────────────────────
     if q_lower.startswith("important:"):
         clean_q = _clean_question(q)
-        prompt  = build_structured_prompt(clean_q)
-        decoded = generate_ai(prompt, max_new_tokens=400)
-        decoded = format_pointwise_answer(decoded, clean_q)
-        ans     = translate_text(decoded, language)
+
+        def generate_important():
+            prompt  = build_structured_prompt(clean_q)
+            decoded = generate_ai(prompt, max_new_tokens=400, cancel_token=cancel_token)
+            if not decoded.strip():
+                return _finish_ai_answer(decoded, clean_q, cancel_token)
+            return _keep_failure(decoded, format_pointwise_answer(decoded, clean_q))
+
+        def compute_important():
+            return _with_semantic_cache("important", clean_q, generate_important, cancel_token)
+
+        ans = _answer_once("important", clean_q, language, compute_important, cancel_token)
         save_history(q, ans)
         return ans
 
     # ── 2. STRUCTURE / IMAGE REQUEST ──────────────────────────────
-    if any(kw in q_lower for kw in ["structure", "draw", "molecule", "smiles"]):
-        for compound in smiles_map:
-            if compound in q_lower:
-                img_path = generate_structure_image(compound)
-                if img_path:
-                    ans = (
-                        f"✅ Molecular structure of **{compound.title()}** generated.\n\n"
-                        f"**SMILES notation:** `{smiles_map[compound]}`\n\n"
-                        f"Use the Structure tab to view the 2D diagram."
-                    )
-                else:
-                    ans = f"Could not render structure for {compound}. SMILES: {smiles_map.get(compound, 'unknown')}"
-                ans = translate_text(ans, language)
-                save_history(q, ans)
-                return ans
+    compound = _find_structure_compound(q_lower)
+    if compound:
+        _, smiles = resolve_smiles(compound)
+        image_key = generate_structure_image(compound)
+        if image_key:
+            ans = template("structure_ok", language).format(
+                compound=compound.title(), smiles=smiles
+            )
+        else:
+            ans = template("structure_failed", language).format(
+                compound=compound, smiles=smiles or 'unknown'
+            )
+        ans = localize(ans, language)
+        save_history(q, ans)
+        return ans
 
     # ── 3. PERIODIC TABLE ─────────────────────────────────────────
-    periodic = periodic_lookup(q)
+    periodic = periodic_lookup(q, language)
     if periodic:
-        ans = translate_text(periodic, language)
+        ans = localize(periodic, language)
         save_history(q, ans)
         return ans
 
@@ -1493,46 +2387,121 @@ def generate_answer(text, language="en"):
         if formula:
             mass = molar_mass(formula)
             if mass:
-                ans = (
-                    f"## Molar Mass of {formula}\n\n"
-                    f"**Result:** {mass} g/mol\n\n"
-                    f"## Step-by-Step Calculation\n\n"
-                    f"1. Identify each element and its subscript count in the formula\n"
-                    f"2. Look up the standard atomic mass (IUPAC values)\n"
-                    f"3. Multiply each element's atomic mass by its count\n"
-                    f"4. Sum all values\n\n"
-                    f"**Answer:** {mass} g/mol\n\n"
-                    f"## Key Fact\n\n"
-                    f"1 mole of {formula} = {mass} g and contains 6.022 × 10²³ formula units."
-                )
-                ans = translate_text(ans, language)
+                ans = template("molar_mass", language).format(formula=formula, mass=mass)
+                ans = localize(ans, language)
                 save_history(q, ans)
                 return ans
 
     # ── 5. PDF MODE ───────────────────────────────────────────────
     if q.startswith("PDF:"):
         pdf_text = q.replace("PDF:", "").strip()
-        result   = analyze_pdf_text(pdf_text)
-        ans = (
-            f"📄 **Summary:**\n{result['summary']}\n\n"
-            f"🧪 **Quiz:**\n{result['quiz']}\n\n"
-            f"🎬 **Video Script:**\n{result['video_script']}"
-        )
-        ans = translate_text(ans, language)
+
+        def compute_pdf():
+            result = analyze_pdf_text(pdf_text)
+            return (
+                f"📄 **Summary:**\n{result['summary']}\n\n"
+                f"🧪 **Quiz:**\n{result['quiz']}\n\n"
+                f"🎬 **Video Script:**\n{result['video_script']}"
+            )
+
+        ans = _answer_once("pdf", pdf_text, language, compute_pdf)
         save_history(q, ans)
         return ans
 
     # ── 6. STRUCTURED AI MODEL ────────────────────────────────────
-    prompt  = build_structured_prompt(q)
-    decoded = generate_ai(prompt, max_new_tokens=400)
+    def generate_structured():
+        prompt       = build_structured_prompt(q)
+        wiki_pending = prefetch_wikipedia(q)
+        decoded      = generate_ai(prompt, max_new_tokens=400, cancel_token=cancel_token)
+        return _finish_ai_answer(decoded, q, cancel_token, wiki_pending)
 
-    # ── 7. WIKIPEDIA FALLBACK ─────────────────────────────────────
-    if len(decoded.split()) < 20:
-        wiki = wikipedia_lookup(q)
-        if wiki and len(wiki) > 50:
-            decoded = wiki
+    def compute_ai():
+        return _with_semantic_cache("ai", q, generate_structured, cancel_token)
 
-    decoded = format_pointwise_answer(decoded, q)
-    ans = translate_text(decoded, language)
+    ans = _answer_once("ai", q, language, compute_ai, cancel_token)
     save_history(q, ans)
     return ans
+
+
+# ══════════════════════════════════════════════
+# STREAMING ANSWER (Server-Sent Events)
+# ══════════════════════════════════════════════
+
+def stream_answer(text, language="en", cancel_token=None):
+    """
+    Generator of events for /predict/stream:
+      {"event": "token", "text": ...}    — raw English text as it is decoded
+      {"event": "final", "output": ...}  — post-processed, translated answer
+    Deterministic routes and cached answers produce only the final event.
+
+    Streamed (greedy) answers are cached apart from the beam-search ones,
+    under "<route>:stream", so neither path decides what the other serves.
+    """
+    q = text.strip()
+    route = classify_route(q) if q else "empty"
+    key_q = _clean_question(q) if route == "important" else q
+    stream_route = f"{route}:stream"
+
+    if route not in ("important", "ai") or answer_cache.contains(route, key_q):
+        yield {"event": "final", "output": generate_answer(q, language=language, cancel_token=cancel_token)}
+        return
+    if answer_cache.contains(stream_route, key_q):
+        ans = answer_cache.get_or_compute(
+            stream_route, key_q, language,
+            lambda: generate_answer(q, language="en", cancel_token=cancel_token), translate_text,
+            cacheable=_cacheable_unless_cancelled(cancel_token),
+        )
+        yield {"event": "final", "output": ans}
+        return
+
+    prompt = build_structured_prompt(key_q)
+    wiki_pending = prefetch_wikipedia(q) if route == "ai" else None
+    pieces = []
+    failed = False
+    try:
+        for piece in stream_ai(prompt, max_new_tokens=400, cancel_token=cancel_token):
+            pieces.append(piece)
+            yield {"event": "token", "text": piece}
+    except Exception as e:
+        print(f"[Model Error] {e}")
+        failed = True
+
+    raw     = "".join(pieces)
+    decoded = clean_output(raw, prompt) if raw.strip() else ""
+    if failed or not raw.strip():
+        decoded = UncacheableAnswer(decoded)
+    if route == "ai" or not decoded.strip():
+        english = _finish_ai_answer(decoded, key_q, cancel_token, wiki_pending)
+    else:
+        english = _keep_failure(decoded, format_pointwise_answer(decoded, key_q))
+
+    ans = answer_cache.get_or_compute(
+        stream_route, key_q, language, lambda: english, translate_text,
+        cacheable=_cacheable_unless_cancelled(cancel_token),
+    )
+    save_history(q, ans)
+    yield {"event": "final", "output": ans}
+
+
+# ══════════════════════════════════════════════
+# METRICS
+# ══════════════════════════════════════════════
+
+def get_metrics():
+    return {
+        "backend":      BACKEND,
+        "precision":    active_precision,
+        "batching":     batcher.stats(),
+        "worker_pool":  worker_pool.stats() if worker_pool else None,
+        "answer_cache": answer_cache.stats(),
+        "translation_memory": translation_memory.stats(),
+        "translator":   translator.stats(),
+        "locales":      locales.stats(),
+        "wikipedia":    wiki.stats(),
+        "encyclopedia": {"articles": len(encyclopedia)} if encyclopedia else None,
+        "compound_db":  compound_db.stats() if compound_db else None,
+        "structure_cache": render_cache.stats(),
+        "cancellation": cancellation.stats.snapshot(),
+        "single_flight": inflight.stats(),
+        "semantic_cache": semantic_cache.stats() if semantic_cache else None,
+    }
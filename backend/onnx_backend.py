@@ -0,0 +1,134 @@
+"""onnx_backend.py — ONNX Runtime execution backend for FLAN-T5
+KIET University · JNTU Kakinada
+--------------------------------------
+Exports the merged checkpoint (see compile_model.py) to ONNX —
+encoder, decoder and decoder-with-past-key-values — and runs it through
+onnxruntime's CPUExecutionProvider with full graph optimisation.
+
+The loaded model exposes the same .generate() API as the PyTorch model,
+so generate_ai() and the micro-batcher work unchanged.  Select it with
+CHEMAI_BACKEND=onnx.
+
+Usage:
+    pip install "optimum[onnxruntime]"
+    python compile_model.py                 # once, produces the merged checkpoint
+    python onnx_backend.py export           # writes MyFinetunedModel-onnx/
+    python onnx_backend.py parity           # PyTorch vs ONNX output check
+"""
+
+import argparse
+import os
+import sys
+
+ONNX_PROVIDER = "CPUExecutionProvider"
+
+
+def _require_optimum():
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError:
+        raise ImportError(
+            "\n[ChemAI ERROR] 'optimum[onnxruntime]' is not installed.\n"
+            "Fix it by running:  pip install \"optimum[onnxruntime]\"\n"
+        )
+    return ORTModelForSeq2SeqLM
+
+
+def export_onnx(source_path, output_path):
+    ORTModelForSeq2SeqLM = _require_optimum()
+    from transformers import AutoTokenizer
+
+    if not os.path.isdir(source_path):
+        raise RuntimeError(
+            f"[ChemAI ERROR] '{source_path}/' not found — run 'python compile_model.py' first "
+            "(the LoRA adapter must be merged before export)."
+        )
+
+    print(f"[ChemAI] Exporting '{source_path}/' to ONNX (encoder + decoder with past)...")
+    ort_model = ORTModelForSeq2SeqLM.from_pretrained(source_path, export=True, use_cache=True)
+    ort_model.save_pretrained(output_path)
+    AutoTokenizer.from_pretrained(source_path).save_pretrained(output_path)
+    print(f"[ChemAI] ONNX model written to '{output_path}/'.")
+
+
+def load_onnx_model(path, num_threads=0):
+    ORTModelForSeq2SeqLM = _require_optimum()
+    import onnxruntime as ort
+    from transformers import AutoTokenizer
+
+    if not os.path.isdir(path):
+        raise RuntimeError(
+            f"[ChemAI ERROR] ONNX model '{path}/' not found — run 'python onnx_backend.py export'."
+        )
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if num_threads:
+        options.intra_op_num_threads = num_threads
+
+    print(f"[ChemAI] Loading ONNX model from '{path}/' ({ONNX_PROVIDER})...")
+    tok = AutoTokenizer.from_pretrained(path)
+    mdl = ORTModelForSeq2SeqLM.from_pretrained(
+        path,
+        provider=ONNX_PROVIDER,
+        session_options=options,
+        use_cache=True,
+    )
+    return tok, mdl
+
+
+# ══════════════════════════════════════════════
+# PARITY CHECK
+# ══════════════════════════════════════════════
+
+PARITY_PROMPTS = [
+    "What is hybridization in chemistry?",
+    "Explain the difference between ionic and covalent bonds.",
+    "What is the pH of a neutral solution?",
+    "Describe Le Chatelier's principle.",
+    "What happens during electrolysis of water?",
+]
+
+
+def check_parity(onnx_path, prompts=PARITY_PROMPTS, max_new_tokens=64):
+    """Generate with both backends and return a list of mismatching prompts."""
+    os.environ["CHEMAI_BACKEND"]   = "torch"
+    os.environ["CHEMAI_PRECISION"] = "fp32"
+    os.environ["CHEMAI_WORKERS"]   = "0"     # no inference pool for a CLI
+    import model as chem
+
+    _, ort_model = load_onnx_model(onnx_path)
+
+    mismatches = []
+    for prompt in prompts:
+        inputs = chem.tokenizer(prompt, return_tensors="pt", truncation=True, max_length=512)
+        torch_ids = chem.model.generate(**inputs, max_new_tokens=max_new_tokens, **chem.GENERATION_KWARGS)
+        onnx_ids  = ort_model.generate(**inputs, max_new_tokens=max_new_tokens, **chem.GENERATION_KWARGS)
+        torch_out = chem.tokenizer.decode(torch_ids[0], skip_special_tokens=True)
+        onnx_out  = chem.tokenizer.decode(onnx_ids[0], skip_special_tokens=True)
+        status    = "OK " if torch_out == onnx_out else "DIFF"
+        print(f"[{status}] {prompt}")
+        if torch_out != onnx_out:
+            print(f"       torch: {torch_out}\n       onnx:  {onnx_out}")
+            mismatches.append(prompt)
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ONNX Runtime backend tools.")
+    parser.add_argument("command", choices=["export", "parity"])
+    parser.add_argument("--source", default="MyFinetunedModel-merged")
+    parser.add_argument("--output", default="MyFinetunedModel-onnx")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_onnx(args.source, args.output)
+        return
+
+    mismatches = check_parity(args.output)
+    print(f"[ChemAI] Parity: {len(PARITY_PROMPTS) - len(mismatches)}/{len(PARITY_PROMPTS)} identical.")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""pdf_pipeline.py — Bounded PDF extraction and token-sized chunking
+KIET University · JNTU Kakinada
+--------------------------------------
+/pdf-analyze used to write the upload to a temp file, concatenate every
+page into one string and keep only the first 2000 characters.  Here:
+
+  • open_pdf()       — opens the document straight from the upload bytes
+  • iter_pdf_pages() — extracts pages lazily and stops at a page limit or
+                       a byte limit, so huge manuals cost bounded memory;
+                       `info` records how much was read and whether the
+                       document was cut short
+  • chunk_pages()    — packs paragraphs (split further into sentences and
+                       words when needed) into chunks of at most
+                       `chunk_tokens` tokens for the map step in model.py
+"""
+
+import re
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END    = re.compile(r"(?<=[.!?])\s+")
+
+
+def open_pdf(data):
+    import fitz  # PyMuPDF
+    return fitz.open(stream=data, filetype="pdf")
+
+
+def iter_pdf_pages(doc, max_pages=50, max_bytes=200_000, info=None):
+    """
+    Yield the text of each page until max_pages pages or max_bytes bytes of
+    text.  `info` (a dict) receives pages_total, pages_read and truncated.
+    """
+    info = info if info is not None else {}
+    info.update(pages_total=doc.page_count, pages_read=0, truncated=doc.page_count > max_pages)
+    used = 0
+    try:
+        for number in range(min(doc.page_count, max_pages)):
+            text = doc.load_page(number).get_text()
+            size = len(text.encode("utf-8"))
+            info["pages_read"] += 1
+            if used + size > max_bytes:
+                remaining = max_bytes - used
+                info["truncated"] = True
+                yield text.encode("utf-8")[:remaining].decode("utf-8", errors="ignore")
+                return
+            used += size
+            yield text
+    finally:
+        doc.close()
+
+
+def _split_long(text, count_tokens, chunk_tokens):
+    """Split text that is longer than one chunk on word boundaries."""
+    piece, size = [], 0
+    for word in text.split():
+        n = count_tokens(word)
+        if piece and size + n > chunk_tokens:
+            yield " ".join(piece)
+            piece, size = [], 0
+        piece.append(word)
+        size += n
+    if piece:
+        yield " ".join(piece)
+
+
+def _pieces(text, count_tokens, chunk_tokens):
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = " ".join(paragraph.split())
+        if not paragraph:
+            continue
+        if count_tokens(paragraph) <= chunk_tokens:
+            yield paragraph
+            continue
+        for sentence in _SENTENCE_END.split(paragraph):
+            if count_tokens(sentence) <= chunk_tokens:
+                yield sentence
+            else:
+                yield from _split_long(sentence, count_tokens, chunk_tokens)
+
+
+def chunk_pages(pages, count_tokens, chunk_tokens=400, max_chunks=None):
+    """
+    Pack the text of `pages` (any iterable, consumed lazily) into chunks of
+    at most chunk_tokens tokens.  Stops after max_chunks chunks.
+    """
+    chunk, size, emitted = [], 0, 0
+    for page in pages:
+        for piece in _pieces(page, count_tokens, chunk_tokens):
+            n = count_tokens(piece)
+            if chunk and size + n > chunk_tokens:
+                yield " ".join(chunk)
+                emitted += 1
+                if max_chunks and emitted >= max_chunks:
+                    return
+                chunk, size = [], 0
+            chunk.append(piece)
+            size += n
+    if chunk:
+        yield " ".join(chunk)
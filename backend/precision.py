@@ -0,0 +1,202 @@
+"""precision.py — CPU inference precision modes for FLAN-T5
+KIET University · JNTU Kakinada
+--------------------------------------
+  • fp32  — original weights (reference)
+  • bf16  — bfloat16 weights, only when the CPU has native bf16 support
+            (AVX512-BF16 / AMX); otherwise falls back to fp32
+  • int8  — dynamic int8 quantization of every nn.Linear layer
+
+Select the mode with CHEMAI_PRECISION=fp32|bf16|int8.
+
+Built-in comparison against fp32 on the validation split
+(val_source_target.jsonl written by the dataset builder):
+
+    python precision.py --validation val_source_target.jsonl --limit 50
+
+Each mode is measured in its own subprocess, so its peak RSS covers only
+loading that mode and generating with it.
+"""
+
+import argparse
+import difflib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+import torch
+
+PRECISION_MODES = ("fp32", "bf16", "int8")
+
+
+def cpu_supports_bf16():
+    try:
+        if torch.ops.mkldnn._is_mkldnn_bf16_supported():
+            return True
+    except Exception:
+        pass
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+        return "avx512_bf16" in flags or "amx_bf16" in flags
+    except OSError:
+        return False
+
+
+def apply_precision(model, mode):
+    """Return (model, active_mode).  Unsupported modes fall back to fp32."""
+    mode = (mode or "fp32").lower()
+    if mode not in PRECISION_MODES:
+        print(f"[ChemAI] Unknown precision '{mode}' — using fp32.")
+        return model, "fp32"
+
+    if mode == "bf16":
+        if not cpu_supports_bf16():
+            print("[ChemAI] CPU has no native bfloat16 support — using fp32.")
+            return model, "fp32"
+        return model.to(torch.bfloat16), "bf16"
+
+    if mode == "int8":
+        quantized = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        return quantized, "int8"
+
+    return model, "fp32"
+
+
+def _tensor_bytes(value):
+    if isinstance(value, torch.Tensor):
+        return value.numel() * value.element_size()
+    if isinstance(value, (tuple, list)):
+        return sum(_tensor_bytes(v) for v in value)
+    return 0
+
+
+def model_size_mb(model):
+    """Weight footprint, including packed int8 Linear weights."""
+    return sum(_tensor_bytes(v) for v in model.state_dict().values()) / (1024 * 1024)
+
+
+# ══════════════════════════════════════════════
+# COMPARISON AGAINST FP32
+# ══════════════════════════════════════════════
+
+def _load_questions(path, limit):
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            if row.get("source"):
+                questions.append(row["source"])
+            if len(questions) >= limit:
+                break
+    return questions
+
+
+def _run(model, tokenizer, questions, generation_kwargs, max_new_tokens):
+    outputs, latencies = [], []
+    for question in questions:
+        inputs = tokenizer(question, return_tensors="pt", truncation=True, max_length=512)
+        start  = time.perf_counter()
+        with torch.no_grad():
+            ids = model.generate(**inputs, max_new_tokens=max_new_tokens, **generation_kwargs)
+        latencies.append(time.perf_counter() - start)
+        outputs.append(tokenizer.decode(ids[0], skip_special_tokens=True))
+    return outputs, latencies
+
+
+_RESULT_PREFIX = "PRECISION_RESULT "
+
+
+def measure_mode(mode, questions, max_new_tokens):
+    """Load model.py in `mode` in this process and time it on `questions`."""
+    os.environ["CHEMAI_PRECISION"] = mode
+    os.environ["CHEMAI_WORKERS"]   = "0"     # no inference pool for a CLI
+    import model as chem
+
+    outputs, latencies = _run(chem.model, chem.tokenizer, questions, chem.GENERATION_KWARGS, max_new_tokens)
+    return {
+        "mode":        chem.active_precision,
+        "model_mb":    round(model_size_mb(chem.model), 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "outputs":     outputs,
+        "latencies":   latencies,
+    }
+
+
+def _measure_in_subprocess(mode, args):
+    command = [
+        sys.executable, os.path.abspath(__file__),
+        "--validation", args.validation, "--limit", str(args.limit),
+        "--max-new-tokens", str(args.max_new_tokens), "--measure", mode,
+    ]
+    completed = subprocess.run(command, stdout=subprocess.PIPE, text=True, check=True)
+    for line in completed.stdout.splitlines():
+        if line.startswith(_RESULT_PREFIX):
+            return json.loads(line[len(_RESULT_PREFIX):])
+    raise RuntimeError(f"no result from the {mode} run")
+
+
+def compare_modes(results):
+    """Rows of the comparison; results[0] (fp32) is the reference."""
+    reference = results[0]["outputs"]
+    report    = []
+    for result in results:
+        outputs, latencies = result["outputs"], result["latencies"]
+        similarity = [difflib.SequenceMatcher(None, a, b).ratio() for a, b in zip(reference, outputs)]
+        exact      = sum(a == b for a, b in zip(reference, outputs))
+        report.append({
+            "mode":           result["mode"],
+            "model_mb":       result["model_mb"],
+            "peak_rss_mb":    result["peak_rss_mb"],
+            "mean_latency_s": round(statistics.mean(latencies), 3),
+            "p95_latency_s":  round(sorted(latencies)[int(0.95 * (len(latencies) - 1))], 3),
+            "exact_match":    round(exact / len(outputs), 3),
+            "similarity":     round(statistics.mean(similarity), 3),
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fp32 / bf16 / int8 inference.")
+    parser.add_argument("--validation", default="val_source_target.jsonl")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--modes", default=",".join(PRECISION_MODES))
+    parser.add_argument("--max-new-tokens", type=int, default=128)
+    parser.add_argument("--measure", help=argparse.SUPPRESS)   # one mode, in a subprocess
+    args = parser.parse_args()
+
+    questions = _load_questions(args.validation, args.limit)
+    if not questions:
+        raise SystemExit(f"[ChemAI] No questions found in {args.validation}")
+
+    if args.measure:
+        result = measure_mode(args.measure, questions, args.max_new_tokens)
+        print(_RESULT_PREFIX + json.dumps(result, ensure_ascii=False), flush=True)
+        return
+
+    # The comparison always starts from the fp32 weights.
+    modes = ["fp32"] + [m for m in args.modes.split(",") if m and m != "fp32"]
+    print(f"[ChemAI] Comparing {', '.join(modes)} on {len(questions)} validation questions...")
+    report = compare_modes([_measure_in_subprocess(mode, args) for mode in modes])
+
+    header = f"{'mode':<6}{'model MB':>10}{'peak RSS MB':>13}{'mean s':>9}{'p95 s':>8}{'exact':>8}{'similarity':>12}"
+    print(header)
+    print("-" * len(header))
+    for row in report:
+        print(
+            f"{row['mode']:<6}{row['model_mb']:>10}{row['peak_rss_mb']:>13}"
+            f"{row['mean_latency_s']:>9}{row['p95_latency_s']:>8}"
+            f"{row['exact_match']:>8}{row['similarity']:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
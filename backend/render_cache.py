@@ -0,0 +1,111 @@
+"""render_cache.py — Content-addressed cache of rendered structure images
+KIET University · JNTU Kakinada
+--------------------------------------
+Structure PNGs used to be re-rendered by RDKit on every request, written
+to the working directory and then renamed into structures/, with two
+concurrent requests for one compound racing on the same file name.
+
+Images are now keyed on (canonical SMILES, size, style, renderer
+version) — or on a grid spec for worksheet grids — and the key doubles
+as the ETag of the GET /structure/image/<key>.png response.  The version
+changes with RDKit or the drawing options, so an upgrade never serves
+(or revalidates) images drawn by the old code.
+
+  • memory — PNG bytes in an LRU (cache.MemoryStore)
+  • disk   — every render is mirrored to <folder>/<key>.png with an
+             atomic rename, so restarts and other workers reuse it
+  • locks  — one lock per key: concurrent requests for the same image
+             wait for a single render instead of racing
+"""
+
+import hashlib
+import os
+import threading
+
+from cache import MemoryStore
+
+
+class RenderCache:
+    def __init__(self, render, max_entries=256, folder="cache/structures", version=""):
+        """render(canonical_smiles, size, style) returns PNG bytes or None."""
+        self.render    = render
+        self.folder    = folder
+        self.version   = version
+        self._memory   = MemoryStore(max_entries=max_entries, ttl=None)
+        self._lock     = threading.Lock()
+        self._locks    = {}
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "renders": 0, "failures": 0}
+        os.makedirs(folder, exist_ok=True)
+
+    def key(self, canonical_smiles, size, style):
+        raw = f"{canonical_smiles}|{size[0]}x{size[1]}|{style}|{self.version}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _path(self, key):
+        return os.path.join(self.folder, f"{key}.png")
+
+    def _read_disk(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key, png):
+        tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(png)
+        os.replace(tmp_path, self._path(key))
+
+    def get(self, key):
+        """PNG bytes for a key returned by get_or_render(), or None."""
+        png = self._memory.get(key)
+        if png is not None:
+            self._count("memory_hits")
+            return png
+        png = self._read_disk(key)
+        if png is not None:
+            self._count("disk_hits")
+            self._memory.set(key, png)
+        return png
+
+    def get_or_render(self, canonical_smiles, size=(400, 300), style="default", render=None):
+        """
+        Return the cache key of the image, rendering it at most once.
+        `render` overrides the default renderer (e.g. for grids).
+        """
+        key = self.key(canonical_smiles, size, style)
+        if self.get(key) is not None:
+            return key
+
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        with key_lock:
+            try:
+                if self.get(key) is not None:      # rendered while we waited
+                    return key
+                try:
+                    png = (render or self.render)(canonical_smiles, size, style)
+                except Exception as e:
+                    print(f"[Render Error] {e}")
+                    png = None
+                if png is None:
+                    self._count("failures")
+                    return None
+                self._count("renders")
+                self._write_disk(key, png)
+                self._memory.set(key, png)
+                return key
+            finally:
+                with self._lock:
+                    self._locks.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        counters["memory_entries"] = len(self._memory)
+        return counters
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 
 class Query(BaseModel):
     text: str
@@ -15,3 +15,9 @@ class Query(BaseModel):
 class Auth(BaseModel):
     email: str
     password: str
+
+class StructureBatch(BaseModel):
+    items: List[str]                 # compound names or SMILES
+    mode: Optional[str] = "grid"     # "grid" or "individual"
+    per_row: Optional[int] = Field(4, ge=1, le=10)
+    style: Optional[str] = "default"
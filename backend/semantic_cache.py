@@ -0,0 +1,158 @@
+"""semantic_cache.py — Paraphrase-tolerant answer cache
+KIET University · JNTU Kakinada
+--------------------------------------
+Exact-match caching misses paraphrases such as "explain sp3 hybridisation"
+and "what is sp3 hybridization?".  This cache stores one embedding per
+answered question (mean-pooled FLAN-T5 encoder output, L2-normalised) in
+a fixed-size NumPy matrix and returns the stored answer when the cosine
+similarity of a new question is at or above `threshold`.
+
+  • bounded size — least-recently-used entry is overwritten when full
+  • persistence  — saved atomically to a .npz file every `save_every`
+                   additions and at shutdown, reloaded on startup
+  • fingerprint  — identifies the encoder (checkpoint, precision,
+                   backend) that produced the embeddings; an index saved
+                   with a different fingerprint is discarded on load,
+                   since its vectors can't be compared with new ones
+"""
+
+import atexit
+import io
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+
+class SemanticCache:
+    def __init__(self, embed, threshold=0.95, max_entries=5000, path=None, save_every=20,
+                 fingerprint=""):
+        self.embed       = embed
+        self.fingerprint = fingerprint
+        self.threshold   = float(threshold)
+        self.max_entries = max(1, int(max_entries))
+        self.path        = path
+        self.save_every  = max(1, int(save_every))
+
+        self._lock     = threading.Lock()
+        self._vectors  = None          # (max_entries, dim) float32, allocated on first add
+        self._routes   = np.full(self.max_entries, -1, dtype=np.int32)
+        self._route_id = {}
+        self._entries  = []            # {"route", "question", "answer", "hits", "last_used"}
+        self._unsaved  = 0
+        self._hits     = 0
+        self._misses   = 0
+        self._evicted  = 0
+
+        if path and os.path.exists(path):
+            self.load()
+        if path:
+            atexit.register(self.save)
+
+    # ── lookup / insert ───────────────────────────────────────────
+
+    def lookup(self, route, question):
+        """Return (answer or None, embedding).  Pass the embedding on to add()."""
+        vector = np.asarray(self.embed(question), dtype=np.float32)
+        with self._lock:
+            size = len(self._entries)
+            route_id = self._route_id.get(route)
+            if size and route_id is not None:
+                sims = self._vectors[:size] @ vector
+                sims[self._routes[:size] != route_id] = -1.0
+                best = int(np.argmax(sims))
+                if sims[best] >= self.threshold:
+                    entry = self._entries[best]
+                    entry["hits"]     += 1
+                    entry["last_used"] = time.time()
+                    self._hits += 1
+                    return entry["answer"], vector
+            self._misses += 1
+        return None, vector
+
+    def add(self, route, question, answer, vector=None):
+        if vector is None:
+            vector = np.asarray(self.embed(question), dtype=np.float32)
+        entry = {"route": route, "question": question, "answer": answer,
+                 "hits": 0, "last_used": time.time()}
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+            if len(self._entries) < self.max_entries:
+                index = len(self._entries)
+                self._entries.append(entry)
+            else:
+                index = min(range(len(self._entries)), key=lambda i: self._entries[i]["last_used"])
+                self._entries[index] = entry
+                self._evicted += 1
+            self._vectors[index] = vector
+            self._routes[index]  = self._route_id.setdefault(route, len(self._route_id))
+
+            self._unsaved += 1
+            should_save = self.path and self._unsaved >= self.save_every
+        if should_save:
+            self.save()
+
+    # ── persistence ───────────────────────────────────────────────
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            if not self._entries or not self._unsaved:
+                return
+            size    = len(self._entries)
+            vectors = self._vectors[:size].copy()
+            meta    = json.dumps(self._entries, ensure_ascii=False)
+            self._unsaved = 0
+
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        buffer = io.BytesIO()
+        np.savez(buffer, vectors=vectors, entries=np.array(meta),
+                 fingerprint=np.array(self.fingerprint))
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                vectors     = data["vectors"].astype(np.float32)
+                entries     = json.loads(str(data["entries"]))
+                fingerprint = str(data["fingerprint"]) if "fingerprint" in data.files else ""
+        except Exception as e:
+            print(f"[Semantic Cache] Could not load {self.path}: {e}")
+            return
+        if fingerprint != self.fingerprint:
+            print(f"[Semantic Cache] {self.path} was built by another encoder — starting empty.")
+            return
+
+        # Keep the most recently used entries if max_entries shrank.
+        order   = sorted(range(len(entries)), key=lambda i: entries[i]["last_used"], reverse=True)
+        order   = order[:self.max_entries]
+        with self._lock:
+            self._vectors = np.zeros((self.max_entries, vectors.shape[1]), dtype=np.float32)
+            self._vectors[:len(order)] = vectors[order]
+            self._entries = [entries[i] for i in order]
+            for index, entry in enumerate(self._entries):
+                self._routes[index] = self._route_id.setdefault(entry["route"], len(self._route_id))
+        print(f"[Semantic Cache] Loaded {len(order)} entries from {self.path}.")
+
+    def stats(self):
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size":        len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold":   self.threshold,
+                "hits":        self._hits,
+                "misses":      self._misses,
+                "hit_ratio":   round(self._hits / total, 3) if total else 0.0,
+                "evicted":     self._evicted,
+            }
@@ -0,0 +1,99 @@
+"""singleflight.py — Coalescing of identical in-flight requests
+KIET University · JNTU Kakinada
+--------------------------------------
+When forty students submit the same question within a few seconds, only
+the first call (the leader) runs; the others wait for the leader's
+result instead of starting their own beam search.  This covers the window
+before the answer cache has anything to return.
+
+If the leader's result can't be reused (its client went away), one waiter
+becomes the next leader and the others keep waiting on it.  A waiter whose
+own cancellation token fires stops waiting and returns fn() itself, which
+ends at once because its generation is already cancelled.
+"""
+
+import threading
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event   = threading.Event()
+        self.result  = None
+        self.error   = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock      = threading.Lock()
+        self._calls     = {}
+        self._leaders   = 0
+        self._coalesced = 0
+        self._retried   = 0
+        self._abandoned = 0
+
+    def _wait(self, call, cancel_token):
+        """Wait for the leader; False if cancel_token fired first."""
+        if cancel_token is None:
+            call.event.wait()
+            return True
+        while not call.event.wait(timeout=0.1):
+            if cancel_token.cancelled:
+                return False
+        return True
+
+    def do(self, key, fn, reusable=None, cancel_token=None):
+        """
+        Run fn() once per key at a time and hand its result to every
+        concurrent caller with the same key.  If reusable(result) is False
+        (e.g. the leader's generation was cancelled) the waiters elect a
+        new leader among themselves.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._leaders += 1
+            else:
+                call.waiters += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.event.set()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        if not self._wait(call, cancel_token):
+            with self._lock:
+                self._abandoned += 1
+            return fn()
+        if call.error is None and (reusable is None or reusable(call.result)):
+            with self._lock:
+                self._coalesced += 1
+            return call.result
+
+        with self._lock:
+            self._retried += 1
+        return self.do(key, fn, reusable, cancel_token)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "waiting":   sum(c.waiters for c in self._calls.values()),
+                "leaders":   self._leaders,
+                "coalesced": self._coalesced,
+                "retried":   self._retried,
+                "abandoned": self._abandoned,
+            }
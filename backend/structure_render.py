@@ -0,0 +1,73 @@
+"""structure_render.py — RDKit renderers for the structure render cache
+KIET University · JNTU Kakinada
+--------------------------------------
+Plain functions returning PNG bytes, importable without model.py so they
+can run in the spawned worker processes of the structure render pool.
+
+  • render_png(smiles, size, style)      — one molecule
+  • render_grid_png(spec, size, style)   — a worksheet grid; `spec` is
+    grid_spec(): the per-row count, then one "SMILES<TAB>legend" per line
+"""
+
+import io
+
+from rdkit import Chem, rdBase
+from rdkit.Chem import Draw
+
+STYLES = ("default", "bw")
+
+# Part of every render cache key: bump DRAW_VERSION when _options() or
+# the grid layout changes, so cached PNGs from the old drawing code are
+# not served under the new one (an RDKit upgrade does this by itself).
+DRAW_VERSION   = 1
+RENDER_VERSION = f"rdkit-{rdBase.rdkitVersion}/draw-{DRAW_VERSION}"
+
+
+def _options(style):
+    options = Draw.MolDrawOptions()
+    if style == "bw":
+        options.useBWAtomPalette()
+    return options
+
+
+def _png(img):
+    if isinstance(img, bytes):
+        return img
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_png(smiles, size, style="default"):
+    try:
+        mol = Chem.MolFromSmiles(smiles)
+        if mol is None:
+            return None
+        return _png(Draw.MolToImage(mol, size=tuple(size), options=_options(style)))
+    except Exception as e:
+        print(f"[RDKit Error] {e}")
+        return None
+
+
+def grid_spec(smiles_list, legends, per_row):
+    lines = [str(per_row)] + [f"{s}\t{legend}" for s, legend in zip(smiles_list, legends)]
+    return "\n".join(lines)
+
+
+def render_grid_png(spec, size, style="default"):
+    try:
+        per_row, *lines = spec.split("\n")
+        pairs   = [line.split("\t", 1) for line in lines]
+        mols    = [Chem.MolFromSmiles(s) for s, _ in pairs]
+        legends = [legend for _, legend in pairs]
+        img = Draw.MolsToGridImage(
+            mols,
+            molsPerRow=int(per_row),
+            subImgSize=tuple(size),
+            legends=legends,
+            drawOptions=_options(style),
+        )
+        return _png(img)
+    except Exception as e:
+        print(f"[RDKit Error] {e}")
+        return None
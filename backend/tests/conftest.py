@@ -0,0 +1,12 @@
+"""conftest.py — make the backend modules importable from backend/tests/
+
+Run from backend/:  python -m pytest -q tests
+
+The tests cover the pure-Python helpers only; nothing here imports
+model.py, torch, FastAPI or RDKit.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, QueueFull
+
+
+def test_slots_are_released_and_handed_to_waiters():
+    async def scenario():
+        admission = AdmissionController(concurrency=1, max_queue=4)
+        order     = []
+
+        async def job(name):
+            async with admission.slot():
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(job(i) for i in range(3)))
+        return order, admission.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == [0, 1, 2]
+    assert stats["running"] == 0 and stats["queue_depth"] == 0 and stats["admitted"] == 3
+
+
+def test_slot_is_released_when_the_job_fails():
+    async def scenario():
+        admission = AdmissionController(concurrency=1, max_queue=1)
+        with pytest.raises(RuntimeError):
+            async with admission.slot():
+                raise RuntimeError("generation failed")
+        return admission.stats()["running"]
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def scenario():
+        admission = AdmissionController(concurrency=1, max_queue=2)
+        await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        admission.release()
+        return admission.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["running"] == 0 and stats["queue_depth"] == 0
+
+
+def test_full_queue_and_lane_limits_reject():
+    async def scenario():
+        admission = AdmissionController(concurrency=1, max_queue=2)
+        await admission.acquire()
+        bulk = asyncio.create_task(admission.acquire("bulk"))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFull) as lane_full:
+            await admission.acquire("bulk")
+        interactive = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFull) as queue_full:
+            await admission.acquire()
+        for task in (bulk, interactive):
+            task.cancel()
+        await asyncio.gather(bulk, interactive, return_exceptions=True)
+        return lane_full.value.status_code, queue_full.value.status_code
+
+    assert asyncio.run(scenario()) == (429, 503)
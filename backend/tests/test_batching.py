@@ -0,0 +1,16 @@
+import pytest
+
+from batching import MicroBatcher
+
+
+def test_prompts_get_their_own_results():
+    batcher = MicroBatcher(lambda prompts, max_new_tokens, tokens: [p.upper() for p in prompts])
+    futures = [batcher.submit(p, 10) for p in ("a", "b", "c")]
+    assert [f.result(timeout=5) for f in futures] == ["A", "B", "C"]
+
+
+def test_short_result_list_fails_the_batch_instead_of_hanging():
+    batcher = MicroBatcher(lambda prompts, max_new_tokens, tokens: prompts[1:])
+    future  = batcher.submit("a", 10)
+    with pytest.raises(RuntimeError):
+        future.result(timeout=5)
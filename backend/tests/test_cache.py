@@ -0,0 +1,83 @@
+import time
+
+from cache import AnswerCache, DocumentCache, MemoryStore, SQLiteStore
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryStore(max_entries=2, ttl=None)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.get("a")
+    store.set("c", 3)
+    assert store.get("a") == 1
+    assert store.get("b") is None
+    assert len(store) == 2
+
+
+def test_memory_store_expires_entries():
+    store = MemoryStore(ttl=0.05)
+    store.set("a", 1)
+    time.sleep(0.1)
+    assert store.get("a") is None
+
+
+def test_sqlite_store_round_trips_and_is_shared(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteStore(path, table="answers").set("k", {"text": "வணக்கம்", "n": [1, 2]})
+    assert SQLiteStore(path, table="answers").get("k") == {"text": "வணக்கம்", "n": [1, 2]}
+
+
+def test_sqlite_store_respects_max_entries(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache.sqlite3"), max_entries=3)
+    for i in range(5):
+        store.set(f"k{i}", i)
+        time.sleep(0.01)
+    assert len(store) == 3
+    assert store.get("k4") == 4
+
+
+def test_answer_cache_translates_cached_english_once():
+    cache     = AnswerCache(MemoryStore(), MemoryStore())
+    computed  = []
+    translate = lambda text, language: f"[{language}] {text}"
+
+    def compute():
+        computed.append(1)
+        return "An atom is..."
+
+    assert cache.get_or_compute("ai", "What is an atom?", "en", compute, translate) == "An atom is..."
+    assert cache.get_or_compute("ai", "what is an atom", "te", compute, translate) == "[te] An atom is..."
+    assert len(computed) == 1
+    assert cache.contains("ai", "WHAT IS AN ATOM?")
+    assert not cache.contains("ai:stream", "what is an atom")
+
+
+def test_answer_cache_skips_uncacheable_answers():
+    cache = AnswerCache(MemoryStore(), MemoryStore())
+    cache.get_or_compute("ai", "q", "en", lambda: "Model error", None, cacheable=lambda a: False)
+    assert not cache.contains("ai", "q")
+
+
+def test_answer_cache_skips_incomplete_translations():
+    cache     = AnswerCache(MemoryStore(), MemoryStore())
+    calls     = []
+    cacheable = lambda answer: bool(answer) and not answer.endswith("(english)")
+
+    def partial(text, language):
+        calls.append(text)
+        return f"[{language}] first line\nsecond line (english)"
+
+    for _ in range(2):
+        cache.get_or_compute("ai", "q", "te", lambda: "An answer.", partial, cacheable=cacheable)
+    assert len(calls) == 2
+    assert cache.contains("ai", "q")
+
+
+def test_document_cache_keys_include_pipeline_params():
+    store  = MemoryStore()
+    digest = DocumentCache.digest(b"%PDF-1.4 ...")
+    DocumentCache(store, params="chunk=400").set_result(digest, "en", {"summary": "old"})
+
+    assert DocumentCache(store, params="chunk=400").get_result(digest, "en") == {"summary": "old"}
+    assert DocumentCache(store, params="chunk=800").get_result(digest, "en") is None
+    assert DocumentCache(store, params="chunk=400").get_result(digest, "hi") is None
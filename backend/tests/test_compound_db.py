@@ -0,0 +1,59 @@
+import pytest
+
+from compound_db import CompoundDB, build_db, normalize_name
+
+ROWS = (
+    "name\tsmiles\tsynonyms\tformula\n"
+    "Acetic acid\tCC(=O)O\tethanoic acid|vinegar acid\tC2H4O2\n"
+    "Caffeine\tCn1cnc2c1c(=O)n(C)c(=O)n2C\t1,3,7-trimethylxanthine\tC8H10N4O2\n"
+    "Lead\t[Pb]\t\tPb\n"
+    "Morphine\tCN1CCC23C4C1CC5=C2C(=C(C=C5)O)OC3C(C=C4)O\t\tC17H19NO3\n"
+    "Nicotine\tCN1CCCC1C2=CN=CC=C2\t\tC10H14N2\n"
+    "\tC\tnameless\t\n"
+)
+
+
+@pytest.fixture
+def db(tmp_path):
+    source = tmp_path / "compounds.tsv"
+    source.write_text(ROWS, encoding="utf-8")
+    path = str(tmp_path / "compounds.sqlite3")
+    assert build_db(path, [str(source)]) == 5
+    return CompoundDB(path)
+
+
+def test_normalize_name():
+    assert normalize_name("  Acetic\tACID ") == "acetic acid"
+    assert normalize_name("Baeyer’s reagent") == "baeyer's reagent"
+
+
+def test_lookup_by_name_and_synonym(db):
+    assert db.lookup("ACETIC  acid")["smiles"] == "CC(=O)O"
+    assert db.lookup("ethanoic acid")["name"] == "Acetic acid"
+    assert db.lookup("unobtainium") is None
+    assert db.lookup("unobtainium") is None
+    assert db.stats()["lru_hits"] == 1
+
+
+def test_find_in_text_prefers_the_longest_name(db):
+    assert db.find_in_text("Draw the structure of vinegar acid, please.")["name"] == "Acetic acid"
+
+
+def test_find_in_text_resolves_one_word_names_in_questions(db):
+    assert db.find_in_text("draw caffeine")["name"] == "Caffeine"
+    assert db.find_in_text("show me the structure of morphine")["name"] == "Morphine"
+    assert db.find_in_text("can you draw nicotine")["name"] == "Nicotine"
+    assert db.find_in_text("is nicotine addictive?")["name"] == "Nicotine"
+
+
+def test_find_in_text_ignores_everyday_words_outside_structure_requests(db):
+    assert db.find_in_text("how does lead poisoning affect children") is None
+    assert db.find_in_text("lead")["name"] == "Lead"
+    assert db.find_in_text("draw the structure of lead")["name"] == "Lead"
+
+
+def test_build_requires_name_and_smiles(tmp_path):
+    source = tmp_path / "bad.csv"
+    source.write_text("title,formula\nWater,H2O\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        build_db(str(tmp_path / "out.sqlite3"), [str(source)])
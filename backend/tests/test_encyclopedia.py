@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from encyclopedia import build_index, open_encyclopedia, query_terms, summarize
+
+ARTICLES = [
+    {"title": "Ionic bond", "text": "An ionic bond is the electrostatic attraction between oppositely "
+                                    "charged ions. It forms between metals and non-metals. Salt is an example."},
+    {"title": "Covalent bond", "text": "A covalent bond is the sharing of electron pairs between atoms. "
+                                       "Ionic character can be partial."},
+    {"title": "Love (chemistry lab slang)", "text": "Short."},
+    {"title": "Romance novels", "text": "Stories about love and relationships are popular worldwide. "
+                                        "They have many readers."},
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    source = tmp_path / "articles.jsonl"
+    source.write_text("\n".join(json.dumps(a) for a in ARTICLES), encoding="utf-8")
+    path = str(tmp_path / "encyclopedia.sqlite3")
+    assert build_index(path, [str(source)]) == 3         # "Short." has no usable summary
+    return open_encyclopedia(path)
+
+
+def test_summary_is_the_first_two_sentences():
+    assert summarize("One.  Two!\nThree? Four.") == "One. Two!"
+
+
+def test_query_terms_drop_stopwords():
+    assert query_terms("What is an ionic bond?") == ["ionic", "bond"]
+
+
+def test_relevant_article_answers(index):
+    assert index.lookup("what is an ionic bond").startswith("An ionic bond is")
+    assert [hit["title"] for hit in index.search("covalent bond")] == ["Covalent bond"]
+
+
+def test_body_only_matches_do_not_answer(index):
+    # "love" appears only in the body of "Romance novels", never in a title.
+    assert index.lookup("what is love") is None
+
+
+def test_low_term_coverage_does_not_answer(index):
+    # Only "ionic" of four terms matches an article with it in the title.
+    assert index.lookup("ionic radius trend periodic") is None
+
+
+def test_missing_index_is_none(tmp_path):
+    assert open_encyclopedia(str(tmp_path / "absent.sqlite3")) is None
+    assert open_encyclopedia("") is None
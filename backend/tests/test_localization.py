@@ -0,0 +1,59 @@
+import json
+
+from localization import Localizer, build_language, source_version
+
+SOURCES = {
+    "templates": {"molar_mass": "The molar mass of {formula} is {mass} g/mol."},
+    "strings":   ["Structure generated."],
+    "quiz_bank": {
+        "acids": [{
+            "question":    "What is the pH of pure water?",
+            "options":     ["A) 7", "B) 1 to 3"],
+            "answer":      "A",
+            "explanation": "Pure water is neutral.",
+        }],
+    },
+}
+
+
+def _tagging(fields, language):
+    return {name: f"[{language}] {text}" for name, text in fields.items()}, True
+
+
+def test_build_translates_every_field_and_keeps_labels():
+    artifact = build_language(SOURCES, "te", _tagging)
+
+    assert artifact["templates"]["molar_mass"] == "[te] The molar mass of {formula} is {mass} g/mol."
+    assert artifact["strings"] == {"Structure generated.": "[te] Structure generated."}
+    question = artifact["quiz_bank"]["acids"][0]
+    assert question["options"] == ["A) [te] 7", "B) [te] 1 to 3"]
+    assert question["answer"] == "A"
+
+
+def test_changed_placeholders_keep_the_english_template():
+    def drop_placeholders(fields, language):
+        return {name: text.replace("{formula}", "X") for name, text in fields.items()}, True
+
+    artifact = build_language(SOURCES, "hi", drop_placeholders)
+    assert artifact["templates"]["molar_mass"] == SOURCES["templates"]["molar_mass"]
+
+
+def test_incomplete_translation_builds_no_artifact():
+    def failing(fields, language):
+        return dict(fields), False              # the translator kept the English text
+
+    assert build_language(SOURCES, "ta", failing) is None
+
+
+def test_localizer_serves_only_current_artifacts(tmp_path):
+    version  = source_version(SOURCES)
+    artifact = dict(build_language(SOURCES, "te", _tagging), version=version)
+    (tmp_path / "te.json").write_text(json.dumps(artifact), encoding="utf-8")
+    (tmp_path / "hi.json").write_text(json.dumps(dict(artifact, version="old")), encoding="utf-8")
+
+    locales = Localizer(str(tmp_path), version)
+    assert locales.string("Structure generated.", "te") == "[te] Structure generated."
+    assert not locales.available("hi")
+    assert locales.template("molar_mass", "hi", "English") == "English"
+    assert locales.quiz_bank("fr") is None
+    assert locales.stats()["loaded"] == ["te"]
@@ -0,0 +1,39 @@
+from matcher import Matcher
+
+TERMS = [("hydrogen", "element"), ("hydrogen", "compound"), ("hydrogen peroxide", "compound"),
+         ("water", "compound"), ("sodium", "element"), ("sodium chloride", "compound")]
+
+
+def _terms(matches):
+    return [m.term for m in matches]
+
+
+def test_longest_match_wins():
+    matcher = Matcher(TERMS)
+    assert _terms(matcher.find("Draw hydrogen peroxide and water")) == ["hydrogen peroxide", "water"]
+
+
+def test_find_all_keeps_overlapping_matches_longest_first():
+    matcher = Matcher(TERMS)
+    assert _terms(matcher.find_all("hydrogen peroxide")) == ["hydrogen peroxide", "hydrogen"]
+
+
+def test_whole_words_only():
+    matcher = Matcher(TERMS)
+    assert matcher.find("dehydrogenation of watery sodiums") == []
+    assert _terms(matcher.find("what's (water)?")) == ["water"]
+
+
+def test_case_and_whitespace_with_offsets_into_the_original():
+    matcher = Matcher(TERMS)
+    text    = "Is SODIUM \n\t  Chloride soluble?"
+    [match] = matcher.find(text)
+    assert match.term == "sodium chloride"
+    assert text[match.start:match.end] == "SODIUM \n\t  Chloride"
+
+
+def test_values_are_merged_per_term():
+    matcher = Matcher(TERMS)
+    [match] = matcher.find("hydrogen")
+    assert match.values == ("element", "compound")
+    assert len(matcher) == 5
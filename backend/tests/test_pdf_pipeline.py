@@ -0,0 +1,69 @@
+from pdf_pipeline import chunk_pages, iter_pdf_pages
+
+
+def _words(text):
+    return len(text.split())
+
+
+class FakeDoc:
+    """The slice of the PyMuPDF document API that iter_pdf_pages() uses."""
+
+    def __init__(self, pages):
+        self.pages      = pages
+        self.page_count = len(pages)
+        self.closed     = False
+
+    def load_page(self, number):
+        text = self.pages[number]
+        return type("Page", (), {"get_text": lambda self: text})()
+
+    def close(self):
+        self.closed = True
+
+
+def test_paragraphs_are_packed_up_to_the_token_budget():
+    pages  = ["one two three\n\nfour five", "six seven eight nine"]
+    chunks = list(chunk_pages(pages, _words, chunk_tokens=5))
+    assert chunks == ["one two three four five", "six seven eight nine"]
+    assert all(_words(c) <= 5 for c in chunks)
+
+
+def test_long_paragraphs_split_on_sentences_then_words():
+    text   = "Acids donate protons. Bases accept them. " + " ".join(f"w{i}" for i in range(9))
+    chunks = list(chunk_pages([text], _words, chunk_tokens=4))
+    assert chunks[0] == "Acids donate protons."
+    assert all(_words(c) <= 4 for c in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_max_chunks_stops_early_and_lazily():
+    consumed = []
+
+    def pages():
+        for i in range(100):
+            consumed.append(i)
+            yield f"page {i} text"
+
+    assert len(list(chunk_pages(pages(), _words, chunk_tokens=3, max_chunks=2))) == 2
+    assert len(consumed) < 100
+
+
+def test_extraction_reports_page_limit_truncation():
+    doc  = FakeDoc(["a", "b", "c"])
+    info = {}
+    assert list(iter_pdf_pages(doc, max_pages=2, max_bytes=1000, info=info)) == ["a", "b"]
+    assert info == {"pages_total": 3, "pages_read": 2, "truncated": True}
+    assert doc.closed
+
+
+def test_extraction_reports_byte_limit_truncation():
+    info  = {}
+    pages = list(iter_pdf_pages(FakeDoc(["12345", "67890", "xyz"]), max_pages=10, max_bytes=7, info=info))
+    assert pages == ["12345", "67"]
+    assert info == {"pages_total": 3, "pages_read": 2, "truncated": True}
+
+
+def test_short_documents_are_not_truncated():
+    info = {}
+    assert list(iter_pdf_pages(FakeDoc(["only page"]), info=info)) == ["only page"]
+    assert info["truncated"] is False
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from render_cache import RenderCache
+
+
+class FakeRenderer:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, smiles, size, style):
+        self.calls.append((smiles, size, style))
+        time.sleep(self.delay)
+        if smiles == "bad":
+            return None
+        if smiles == "boom":
+            raise RuntimeError("renderer crashed")
+        return f"PNG:{smiles}:{size[0]}x{size[1]}:{style}".encode()
+
+
+def test_key_covers_every_render_input(tmp_path):
+    cache = RenderCache(FakeRenderer(), folder=str(tmp_path), version="rdkit-1/draw-1")
+    key   = cache.key("CCO", (400, 300), "default")
+
+    assert key == cache.key("CCO", (400, 300), "default")
+    assert key.isalnum() and len(key) == 32
+    assert key != cache.key("CCO", (300, 300), "default")
+    assert key != cache.key("CCO", (400, 300), "bw")
+    assert key != RenderCache(FakeRenderer(), folder=str(tmp_path), version="rdkit-2/draw-1").key(
+        "CCO", (400, 300), "default")
+
+
+def test_concurrent_requests_render_once(tmp_path):
+    render = FakeRenderer(delay=0.1)
+    cache  = RenderCache(render, folder=str(tmp_path))
+    keys   = []
+    threads = [threading.Thread(target=lambda: keys.append(cache.get_or_render("CCO")))
+               for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(render.calls) == 1
+    assert len(set(keys)) == 1
+    assert cache.get(keys[0]) == b"PNG:CCO:400x300:default"
+
+
+def test_disk_copy_is_shared_between_instances(tmp_path):
+    key   = RenderCache(FakeRenderer(), folder=str(tmp_path)).get_or_render("O")
+    other = RenderCache(FakeRenderer(), folder=str(tmp_path))
+
+    assert other.get(key) == b"PNG:O:400x300:default"
+    assert other.stats()["disk_hits"] == 1
+    assert other.get_or_render("O") == key
+    assert other.render.calls == []
+
+
+def test_failed_renders_are_not_cached(tmp_path):
+    render = FakeRenderer()
+    cache  = RenderCache(render, folder=str(tmp_path))
+
+    assert cache.get_or_render("bad") is None
+    assert cache.get_or_render("boom") is None
+    assert cache.get_or_render("bad") is None
+    assert len(render.calls) == 3
+    assert cache.stats()["failures"] == 3
+    assert cache.get("0" * 32) is None
+
+
+def test_render_override_is_used_for_grids(tmp_path):
+    cache = RenderCache(FakeRenderer(), folder=str(tmp_path))
+    key   = cache.get_or_render("2\nCCO\tethanol", (200, 200), "grid",
+                                render=lambda spec, size, style: b"GRID")
+    assert cache.get(key) == b"GRID"
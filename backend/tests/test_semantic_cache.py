@@ -0,0 +1,66 @@
+import numpy as np
+
+from semantic_cache import SemanticCache
+
+VECTORS = {
+    "what is sp3 hybridization":   [1.0, 0.0, 0.0],
+    "explain sp3 hybridisation":   [0.99, 0.141, 0.0],
+    "what is an ionic bond":       [0.0, 1.0, 0.0],
+    "what is a covalent bond":     [0.0, 0.0, 1.0],
+    "define a covalent bond":      [0.0, 0.1, 0.995],
+}
+
+
+def _embed(question):
+    vector = np.asarray(VECTORS[question], dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_paraphrase_above_threshold_is_served():
+    cache = SemanticCache(_embed, threshold=0.95)
+    answer, vector = cache.lookup("ai", "what is sp3 hybridization")
+    assert answer is None
+    cache.add("ai", "what is sp3 hybridization", "sp3 answer", vector)
+
+    assert cache.lookup("ai", "explain sp3 hybridisation")[0] == "sp3 answer"
+    assert cache.lookup("ai", "what is an ionic bond")[0] is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_threshold_is_inclusive_and_strict_below():
+    cache = SemanticCache(_embed, threshold=0.999)
+    cache.add("ai", "what is sp3 hybridization", "sp3 answer")
+    assert cache.lookup("ai", "explain sp3 hybridisation")[0] is None
+    assert cache.lookup("ai", "what is sp3 hybridization")[0] == "sp3 answer"
+
+
+def test_routes_are_kept_apart():
+    cache = SemanticCache(_embed, threshold=0.95)
+    cache.add("important", "what is sp3 hybridization", "pointwise answer")
+    assert cache.lookup("ai", "what is sp3 hybridization")[0] is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticCache(_embed, threshold=0.95, max_entries=2)
+    cache.add("ai", "what is sp3 hybridization", "sp3")
+    cache.add("ai", "what is an ionic bond", "ionic")
+    cache.lookup("ai", "what is sp3 hybridization")          # refreshes "sp3"
+    cache.add("ai", "what is a covalent bond", "covalent")
+
+    assert cache.lookup("ai", "what is an ionic bond")[0] is None
+    assert cache.lookup("ai", "what is sp3 hybridization")[0] == "sp3"
+    assert cache.lookup("ai", "define a covalent bond")[0] == "covalent"
+    assert cache.stats()["evicted"] == 1
+
+
+def test_index_persists_for_the_same_encoder_only(tmp_path):
+    path  = str(tmp_path / "semantic.npz")
+    cache = SemanticCache(_embed, path=path, save_every=1, fingerprint="flan-t5:fp32")
+    cache.add("ai", "what is sp3 hybridization", "sp3 answer")
+
+    reloaded = SemanticCache(_embed, path=path, fingerprint="flan-t5:fp32")
+    assert reloaded.lookup("ai", "explain sp3 hybridisation")[0] == "sp3 answer"
+
+    other = SemanticCache(_embed, path=path, fingerprint="flan-t5:int8")
+    assert other.stats()["size"] == 0
+    assert other.lookup("ai", "what is sp3 hybridization")[0] is None
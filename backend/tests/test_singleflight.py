@@ -0,0 +1,91 @@
+import threading
+import time
+
+from singleflight import SingleFlight
+
+
+class _Token:
+    def __init__(self, cancelled=False):
+        self.cancelled = cancelled
+
+
+def _run_concurrently(count, target):
+    results = [None] * count
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, target(i)))
+               for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    return results
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls  = []
+    gate   = threading.Event()
+
+    def fn():
+        calls.append(1)
+        gate.wait(1)
+        return "answer"
+
+    def caller(i):
+        if i == 0:
+            threading.Timer(0.2, gate.set).start()
+        return flight.do("q", fn)
+
+    assert _run_concurrently(5, caller) == ["answer"] * 5
+    assert len(calls) == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_unusable_result_elects_a_single_new_leader():
+    flight = SingleFlight()
+    calls  = []
+    lock   = threading.Lock()
+
+    def fn():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        time.sleep(0.2)
+        return "cancelled" if first else "answer"
+
+    results = _run_concurrently(5, lambda i: flight.do("q", fn, reusable=lambda r: r != "cancelled"))
+
+    assert len(calls) == 2                         # the leader, then one retry for all waiters
+    assert results.count("cancelled") == 1
+    assert results.count("answer") == 4
+
+
+def test_leader_error_reaches_every_waiter():
+    flight = SingleFlight()
+
+    def fn():
+        time.sleep(0.2)
+        raise ValueError("boom")
+
+    def caller(i):
+        try:
+            return flight.do("q", fn)
+        except ValueError as e:
+            return str(e)
+
+    assert _run_concurrently(3, caller) == ["boom"] * 3
+
+
+def test_cancelled_waiter_stops_waiting():
+    flight  = SingleFlight()
+    release = threading.Event()
+    leader  = threading.Thread(target=lambda: flight.do("q", lambda: release.wait(5) and "slow"))
+    leader.start()
+    time.sleep(0.05)
+
+    started = time.monotonic()
+    assert flight.do("q", lambda: "own", cancel_token=_Token(cancelled=True)) == "own"
+    assert time.monotonic() - started < 1
+    assert flight.stats()["abandoned"] == 1
+
+    release.set()
+    leader.join()
@@ -0,0 +1,106 @@
+from cache import MemoryStore
+from translation import TranslationMemory, mask_protected, segment_markdown, unmask
+from translators import CircuitOpen
+
+
+def _units(text):
+    return [piece for piece, translatable in segment_markdown(text) if translatable]
+
+
+def test_segments_join_back_to_the_original():
+    text = "## Heading\n\n1. **Water** is `O`.\n```json:quiz\n{\"q\": 1}\n```\n---\n  - H2SO4 is an acid  "
+    assert "".join(piece for piece, _ in segment_markdown(text)) == text
+
+
+def test_code_fences_prefixes_and_formula_only_lines_are_not_translated():
+    text = "## Heading\n```\nprint('hi')\n```\n- NaCl\n> Salt dissolves in water."
+    assert _units(text) == ["Heading", "Salt dissolves in water."]
+
+
+def test_mask_and_unmask_round_trip():
+    masked, spans = mask_protected("**H2SO4** reacts with `CCO` at {temp}")
+    assert "H2SO4" not in masked and "CCO" not in masked and "{temp}" not in masked
+    assert unmask(masked.replace("reacts with", "réagit avec"), spans) == \
+        "**H2SO4** réagit avec `CCO` at {temp}"
+
+
+def test_unmask_rejects_lost_or_duplicated_tokens():
+    masked, spans = mask_protected("NaCl and KCl")
+    assert unmask(masked.replace("⟦1⟧", ""), spans) is None
+    assert unmask(masked + " ⟦0⟧", spans) is None
+    assert unmask("⟦ 1 ⟧ et ⟦0⟧", spans) == "KCl et NaCl"
+
+
+def _memory(**kwargs):
+    return TranslationMemory(MemoryStore(ttl=None), **kwargs)
+
+
+def _tagging(calls):
+    def translate(text, language):
+        calls.append(text)
+        return "\n".join(f"[{language}] {line}" for line in text.split("\n"))
+    return translate
+
+
+def test_translations_are_remembered_per_language():
+    calls  = []
+    memory = _memory()
+
+    assert memory.translate_fields({"a": "Acids donate protons."}, "te", _tagging(calls)) == \
+        ({"a": "[te] Acids donate protons."}, True)
+    assert memory.translate_fields({"b": "Acids donate protons."}, "te", _tagging(calls)) == \
+        ({"b": "[te] Acids donate protons."}, True)
+    assert len(calls) == 1
+
+    memory.translate_fields({"a": "Acids donate protons."}, "hi", _tagging(calls))
+    assert len(calls) == 2
+    assert memory.stats()["memory_hits"] == 1
+
+
+def test_fields_share_one_request():
+    calls  = []
+    fields = {"summary": "Acids donate protons.\nBases accept them.", "quiz": "Acids donate protons."}
+    done, complete = _memory().translate_fields(fields, "te", _tagging(calls))
+
+    assert complete
+    assert done == {"summary": "[te] Acids donate protons.\n[te] Bases accept them.",
+                    "quiz": "[te] Acids donate protons."}
+    assert len(calls) == 1
+
+
+def test_merged_reply_falls_back_to_one_unit_per_request():
+    calls = []
+
+    def translate(text, language):
+        calls.append(text)
+        return text.replace("\n", " ")             # the translator merged the lines
+
+    done, complete = _memory().translate_fields({"a": "First line here.\nSecond line here."}, "hi", translate)
+    assert complete
+    assert done["a"] == "First line here.\nSecond line here."
+    assert len(calls) == 3
+
+
+def test_requests_are_split_at_max_chars():
+    calls = []
+    lines = "\n".join(f"Sentence number {word} about chemistry." for word in ("one", "two", "three"))
+    _memory().translate_fields({"a": lines}, "ta", _tagging(calls), max_chars=60)
+    assert len(calls) == 3
+
+
+def test_failures_keep_english_and_open_circuit_is_quiet(capsys):
+    memory = _memory()
+
+    def broken(text, language):
+        raise RuntimeError("down")
+
+    def open_circuit(text, language):
+        raise CircuitOpen("unavailable")
+
+    assert memory.translate_fields({"a": "Keep this line."}, "te", broken) == ({"a": "Keep this line."}, False)
+    assert "Translation Error" in capsys.readouterr().out
+
+    assert memory.translate_fields({"a": "Keep this line."}, "te", open_circuit) == ({"a": "Keep this line."}, False)
+    assert capsys.readouterr().out == ""
+    stats = memory.stats()
+    assert (stats["failures"], stats["circuit_open"]) == (1, 1)
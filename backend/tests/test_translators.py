@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+from translators import CircuitBreaker, CircuitOpen, ResilientTranslator, StubProvider, make_provider
+
+
+class FakeProvider:
+    name = "fake"
+
+    def __init__(self):
+        self.mode  = "ok"            # "ok", "fail" or "hang"
+        self.calls = 0
+        self.hang  = threading.Event()
+
+    def translate(self, text, language):
+        self.calls += 1
+        if self.mode == "fail":
+            raise RuntimeError("provider down")
+        if self.mode == "hang":
+            self.hang.wait(2)
+        return f"<{language}> {text}"
+
+
+def _translator(**breaker):
+    provider = FakeProvider()
+    return provider, ResilientTranslator(provider, timeout=0.1, breaker=CircuitBreaker(**breaker))
+
+
+def test_breaker_opens_after_consecutive_failures_and_rejects_without_calling():
+    provider, translator = _translator(failure_threshold=2, reset_after=60)
+    provider.mode = "fail"
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            translator.translate("hi", "te")
+    assert translator.breaker.state == "open"
+
+    with pytest.raises(CircuitOpen):
+        translator.translate("hi", "te")
+    assert provider.calls == 2
+    assert translator.breaker.stats()["rejected"] == 1
+
+
+def test_success_resets_the_failure_count():
+    provider, translator = _translator(failure_threshold=2, reset_after=60)
+    provider.mode = "fail"
+    with pytest.raises(RuntimeError):
+        translator.translate("hi", "te")
+    provider.mode = "ok"
+    assert translator.translate("hi", "te") == "<te> hi"
+    provider.mode = "fail"
+    with pytest.raises(RuntimeError):
+        translator.translate("hi", "te")
+    assert translator.breaker.state == "closed"
+
+
+def test_half_open_trial_closes_the_breaker_on_success():
+    provider, translator = _translator(failure_threshold=1, reset_after=0.05)
+    provider.mode = "fail"
+    with pytest.raises(RuntimeError):
+        translator.translate("hi", "te")
+    assert translator.breaker.state == "open"
+
+    time.sleep(0.06)
+    assert translator.breaker.state == "half-open"
+    provider.mode = "ok"
+    assert translator.translate("hi", "te") == "<te> hi"
+    assert translator.breaker.state == "closed"
+
+
+def test_half_open_allows_one_trial_and_a_failed_trial_reopens():
+    provider, translator = _translator(failure_threshold=1, reset_after=0.05)
+    provider.mode = "fail"
+    with pytest.raises(RuntimeError):
+        translator.translate("hi", "te")
+    time.sleep(0.06)
+
+    assert translator.breaker.allow()               # the trial call
+    assert not translator.breaker.allow()           # everyone else is still rejected
+    translator.breaker.record_failure()
+    assert translator.breaker.state == "open"
+    assert translator.breaker.stats()["trips"] == 2
+
+
+def test_timeouts_count_as_failures():
+    provider, translator = _translator(failure_threshold=1, reset_after=60)
+    provider.mode = "hang"
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        translator.translate("hi", "te")
+    assert time.monotonic() - started < 1
+    assert translator.stats()["timeouts"] == 1
+    assert translator.breaker.state == "open"
+    provider.hang.set()
+
+
+def test_stub_provider_and_unknown_names():
+    assert make_provider("stub").translate("Water", "hi") == "[hi] Water"
+    assert isinstance(make_provider("stub", stub_latency_ms=1), StubProvider)
+    with pytest.raises(ValueError):
+        make_provider("deepl")
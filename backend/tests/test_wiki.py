@@ -0,0 +1,75 @@
+import threading
+import time
+
+from cache import MemoryStore
+from wiki import WikiLookup
+
+
+class FakeWikipedia:
+    def __init__(self, delay=0.0):
+        self.delay   = delay
+        self.queries = []
+        self.release = threading.Event()
+
+    def __call__(self, query):
+        self.queries.append(query)
+        if self.delay:
+            self.release.wait(self.delay)
+        if "nonsense" in query:
+            return {"summary": None, "resolved": None}
+        return {"summary": f"Summary of {query}.", "resolved": query}
+
+
+def test_summaries_and_misses_are_cached_by_normalised_question():
+    fetch = FakeWikipedia()
+    wiki  = WikiLookup(fetch, MemoryStore(ttl=None), timeout=1)
+
+    assert wiki.lookup("What is pH?") == "Summary of What is pH?."
+    assert wiki.lookup("what is ph") == "Summary of What is pH?."
+    assert wiki.lookup("nonsense words") is None
+    assert wiki.lookup("Nonsense words?") is None
+    assert len(fetch.queries) == 2
+    assert wiki.stats()["hits"] == 2
+
+
+def test_slow_lookup_times_out_but_still_fills_the_cache():
+    fetch = FakeWikipedia(delay=2)
+    wiki  = WikiLookup(fetch, MemoryStore(ttl=None), timeout=0.05)
+
+    started = time.monotonic()
+    assert wiki.lookup("benzene") is None
+    assert time.monotonic() - started < 1
+    assert wiki.stats()["timeouts"] == 1
+
+    fetch.release.set()
+    for _ in range(50):
+        if len(wiki.store):
+            break
+        time.sleep(0.02)
+    assert wiki.lookup("benzene") == "Summary of benzene."
+    assert len(fetch.queries) == 1
+
+
+def test_prefetch_result_and_discard():
+    fetch = FakeWikipedia()
+    wiki  = WikiLookup(fetch, MemoryStore(ttl=None), timeout=1)
+
+    pending = wiki.prefetch("ethanol")
+    assert wiki.result(pending) == "Summary of ethanol."
+    wiki.discard(wiki.prefetch("methanol"))
+
+    stats = wiki.stats()
+    assert (stats["prefetched"], stats["prefetch_used"], stats["prefetch_discarded"]) == (2, 1, 1)
+
+
+def test_fetch_errors_are_not_cached():
+    calls = []
+
+    def failing(query):
+        calls.append(query)
+        raise ConnectionError("offline")
+
+    wiki = WikiLookup(failing, MemoryStore(ttl=None), timeout=1)
+    assert wiki.lookup("acid") is None
+    assert wiki.lookup("acid") is None
+    assert len(calls) == 2
@@ -0,0 +1,249 @@
+"""translation.py — Translation memory for the Chemistry AI backend
+KIET University · JNTU Kakinada
+--------------------------------------
+Every non-English request used to make a googletrans round trip, even
+for static text such as periodic-table cards, molar-mass steps and quiz
+questions.  TranslationMemory remembers each translation under
+(sha256 of the source text, target language):
+
+  L1  in-process LRU with TTL (cache.MemoryStore)
+  L2  SQLite file with TTL and a size budget (cache.SQLiteStore), shared
+      by every uvicorn worker; an L2 hit is copied into L1
+
+One instance is shared by /translate, /predict and /pdf-analyze through
+model.translate_text().
+
+translate_fields() translates several fields (e.g. the summary, quiz and
+video script of a PDF) together: duplicate and remembered lines are not
+sent again, and the rest are joined with newlines into as few requests
+as fit in `max_chars` (usually one), run up to `concurrency` at a time.
+If a reply doesn't come back with one line per unit, that request is
+retried unit by unit.  While the translator's circuit breaker is open the
+lines quietly keep their English text; that is not counted as a failure.
+
+segment_markdown() decides what is sent at all.  Each line of prose is
+translated as one unit, so languages with a different word order (Hindi,
+Telugu and Tamil put the verb last) get a whole sentence to reorder.
+Fenced code blocks (including the ```json:quiz block the frontend
+parses) and line prefixes stay out of the unit; inside it, inline code /
+SMILES, chemical formulas, emphasis markers, URLs and {placeholders} are
+swapped for opaque ⟦n⟧ tokens by mask_protected() and put back
+byte-for-byte by unmask().  A translation that loses a token is dropped
+and the English line is kept.
+"""
+
+import hashlib
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from translators import CircuitOpen
+
+# googletrans rejects requests longer than 5000 characters.
+MAX_REQUEST_CHARS = 4000
+
+
+# ══════════════════════════════════════════════
+# SEGMENTER
+# ══════════════════════════════════════════════
+
+_FENCE       = re.compile(r"^\s*(```|~~~)")
+_LINE_PREFIX = re.compile(r"^\s*(?:#{1,6}\s+|>\s*|[-*+]\s+|\d+[.)]\s+)*")
+_RULE        = re.compile(r"^\s*(?:[-*_]\s*){3,}$")
+_FORMULA     = (
+    r"\b(?:[A-Z][a-z]?[0-9₀-₉]*){2,}[⁺⁻]?(?![\w])"      # NaCl, H2SO4, CaCO3, DNA
+    r"|\b[A-Z][a-z]?[0-9₀-₉]+[⁺⁻]?(?![\w])"              # O2, H₂
+)
+_PROTECTED   = re.compile(
+    r"`[^`\n]+`"                          # inline code, SMILES
+    r"|https?://\S+"                      # URLs
+    r"|\]\([^)\n]*\)"                     # link targets
+    r"|\{[A-Za-z_][A-Za-z0-9_]*\}"         # {placeholders}
+    r"|\*\*|__|\*"                         # emphasis markers
+    r"|" + _FORMULA
+)
+_WORD  = re.compile(r"[^\W\d_]{2,}")
+_TOKEN = re.compile(r"⟦\s*(\d+)\s*⟧")
+
+
+def mask_protected(text):
+    """Replace protected spans with ⟦0⟧, ⟦1⟧, ...; returns (masked, spans)."""
+    spans = []
+
+    def swap(match):
+        spans.append(match.group())
+        return f"⟦{len(spans) - 1}⟧"
+
+    return _PROTECTED.sub(swap, text), spans
+
+
+def unmask(text, spans):
+    """Put the spans back; None if the translator lost or duplicated a token."""
+    found = sorted(int(i) for i in _TOKEN.findall(text))
+    if found != list(range(len(spans))):
+        return None
+    return _TOKEN.sub(lambda match: spans[int(match.group(1))], text)
+
+
+def _trim(text):
+    """Keep surrounding whitespace out of what is sent; translators drop it."""
+    core = text.strip()
+    if not core or not _WORD.search(_PROTECTED.sub(" ", core)):
+        return [(text, False)]
+    start = text.index(core)
+    end   = start + len(core)
+    pieces = [(text[:start], False)] if start else []
+    pieces.append((core, True))
+    if end < len(text):
+        pieces.append((text[end:], False))
+    return pieces
+
+
+def segment_markdown(text):
+    """
+    Split `text` into (piece, translatable) pairs.  Joining every piece
+    gives back `text` exactly; each translatable piece is one line of prose.
+    """
+    pieces, in_fence = [], False
+    for line in (text or "").split("\n"):
+        if pieces:
+            pieces.append(("\n", False))
+        if _FENCE.match(line):
+            in_fence = not in_fence
+            pieces.append((line, False))
+        elif in_fence or _RULE.match(line):
+            pieces.append((line, False))
+        else:
+            prefix = _LINE_PREFIX.match(line).group()
+            if prefix:
+                pieces.append((prefix, False))
+            pieces.extend(_trim(line[len(prefix):]))
+    return pieces
+
+
+# ══════════════════════════════════════════════
+# TRANSLATION MEMORY
+# ══════════════════════════════════════════════
+
+
+class TranslationMemory:
+    def __init__(self, memory_store, disk_store=None, namespace="", concurrency=4):
+        self.memory    = memory_store
+        self.disk      = disk_store
+        self.namespace = namespace     # keeps e.g. stub output apart from real translations
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(concurrency)),
+                                            thread_name_prefix="chemai-translation")
+        self._lock     = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0,
+                          "failures": 0, "requests": 0, "circuit_open": 0}
+
+    def key(self, text, language):
+        return f"{self.namespace}{hashlib.sha256(text.encode('utf-8')).hexdigest()}|{language}"
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, text, language):
+        key = self.key(text, language)
+        translated = self.memory.get(key)
+        if translated is not None:
+            self._count("memory_hits")
+            return translated
+        if self.disk is not None:
+            translated = self.disk.get(key)
+            if translated is not None:
+                self._count("disk_hits")
+                self.memory.set(key, translated)
+                return translated
+        self._count("misses")
+        return None
+
+    def set(self, text, language, translated):
+        key = self.key(text, language)
+        self.memory.set(key, translated)
+        if self.disk is not None:
+            self.disk.set(key, translated)
+
+    def _request(self, units, language, translate):
+        """
+        Translate `units` (single lines) joined by newlines in one call;
+        returns {unit: translation} for the lines that came back intact.
+        """
+        masked = [mask_protected(unit) for unit in units]
+        self._count("requests")
+        try:
+            reply = translate("\n".join(text for text, _ in masked), language)
+        except CircuitOpen:
+            # Already reported when the breaker opened; not a new failure.
+            self._count("circuit_open")
+            return {}
+        except Exception as e:
+            self._count("failures")
+            print(f"[Translation Error] {e}")
+            return {}
+        lines = [reply] if len(units) == 1 else reply.split("\n")
+        if len(lines) != len(units):
+            # The translator merged or split lines: one unit per call.
+            done = {}
+            for unit in units:
+                done.update(self._request([unit], language, translate))
+            return done
+
+        done = {}
+        for unit, line, (_, spans) in zip(units, lines, masked):
+            translated = unmask(line.strip(), spans)
+            if translated is None:
+                self._count("failures")
+                continue
+            self.set(unit, language, translated)
+            done[unit] = translated
+        return done
+
+    def translate_fields(self, fields, language, translate, max_chars=MAX_REQUEST_CHARS):
+        """
+        Translate the prose lines of a dict of texts in as few calls as
+        possible.  Returns (fields, complete); complete is False when any
+        line kept its English text because its translation failed.
+        """
+        pieces = {name: segment_markdown(text) for name, text in fields.items()}
+        units  = list(dict.fromkeys(
+            piece for parts in pieces.values() for piece, translatable in parts if translatable
+        ))
+        done = {}
+        for unit in units:
+            hit = self.get(unit, language)
+            if hit is not None:
+                done[unit] = hit
+
+        batches = _batches([u for u in units if u not in done], max_chars)
+        for result in self._executor.map(lambda b: self._request(b, language, translate), batches):
+            done.update(result)
+        translated = {
+            name: "".join(done.get(p, p) if translatable else p for p, translatable in parts)
+            for name, parts in pieces.items()
+        }
+        return translated, len(done) == len(units)
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        hits  = counters["memory_hits"] + counters["disk_hits"]
+        total = hits + counters["misses"]
+        counters["hit_ratio"]   = round(hits / total, 3) if total else 0.0
+        counters["memory_size"] = len(self.memory)
+        counters["disk_size"]   = len(self.disk) if self.disk is not None else 0
+        return counters
+
+
+def _batches(units, max_chars):
+    batches, batch, size = [], [], 0
+    for unit in units:
+        if batch and size + len(unit) + 1 > max_chars:
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(unit)
+        size += len(unit) + 1
+    if batch:
+        batches.append(batch)
+    return batches
@@ -0,0 +1,198 @@
+"""translators.py — Translation providers with deadlines and a circuit breaker
+KIET University · JNTU Kakinada
+--------------------------------------
+  • GoogleProvider  — googletrans (default); the async-only releases run
+                      on one background event loop shared by every call
+  • StubProvider    — deterministic, offline stand-in for load tests and
+                      benchmarks: "[te] <text>", with optional latency
+  • ResilientTranslator — wraps a provider with a per-call deadline and a
+                      circuit breaker.  After `failure_threshold`
+                      consecutive failures or timeouts the breaker opens
+                      and calls fail immediately (the caller keeps the
+                      English text) until `reset_after` seconds pass;
+                      then a single trial call decides whether it closes.
+
+Select the provider with CHEMAI_TRANSLATOR=google|stub.
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+# ══════════════════════════════════════════════
+# PROVIDERS
+# ══════════════════════════════════════════════
+
+class TranslationProvider:
+    name = "base"
+
+    def translate(self, text, language):
+        raise NotImplementedError
+
+
+class GoogleProvider(TranslationProvider):
+    name = "google"
+
+    def __init__(self):
+        from googletrans import Translator
+        self._translator = Translator()
+        self._loop       = None
+        if inspect.iscoroutinefunction(self._translator.translate):
+            # googletrans >= 4.0.2 is async-only and its HTTP client belongs
+            # to one event loop, so every call runs on this loop instead of
+            # a fresh asyncio.run() per segment.
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name="chemai-googletrans",
+                             daemon=True).start()
+
+    def _submit(self, text, language):
+        return asyncio.run_coroutine_threadsafe(
+            self._translator.translate(text, dest=language), self._loop
+        )
+
+    def _text(self, result, language):
+        if not result or not result.text:
+            raise ValueError(f"empty translation to '{language}'")
+        return result.text
+
+    def translate(self, text, language):
+        if self._loop is not None:
+            return self._text(self._submit(text, language).result(), language)
+        return self._text(self._translator.translate(text, dest=language), language)
+
+
+class StubProvider(TranslationProvider):
+    name = "stub"
+
+    def __init__(self, latency_ms=0.0):
+        self.latency = max(0.0, float(latency_ms)) / 1000.0
+
+    def translate(self, text, language):
+        if self.latency:
+            time.sleep(self.latency)
+        return f"[{language}] {text}"
+
+
+def make_provider(name, stub_latency_ms=0.0):
+    if name == "stub":
+        return StubProvider(stub_latency_ms)
+    if name == "google":
+        return GoogleProvider()
+    raise ValueError(f"unknown translator '{name}' (expected 'google' or 'stub')")
+
+
+# ══════════════════════════════════════════════
+# CIRCUIT BREAKER
+# ══════════════════════════════════════════════
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_after=30.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_after       = float(reset_after)
+        self._lock      = threading.Lock()
+        self._failures  = 0
+        self._opened_at = None
+        self._trial     = False
+        self._rejected  = 0
+        self._trips     = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_after:
+            return "open"
+        return "half-open"
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures  = 0
+            self._opened_at = None
+            self._trial     = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._trial:
+                    self._trips += 1
+                self._opened_at = time.monotonic()
+            self._trial = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state":    self._state(),
+                "failures": self._failures,
+                "trips":    self._trips,
+                "rejected": self._rejected,
+            }
+
+
+# ══════════════════════════════════════════════
+# RESILIENT TRANSLATOR
+# ══════════════════════════════════════════════
+
+class ResilientTranslator:
+    def __init__(self, provider, timeout=5.0, breaker=None, max_workers=8):
+        self.provider  = provider
+        self.timeout   = float(timeout)
+        self.breaker   = breaker or CircuitBreaker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chemai-translate")
+        self._lock     = threading.Lock()
+        self._calls    = 0
+        self._timeouts = 0
+
+    def _admit(self):
+        if not self.breaker.allow():
+            raise CircuitOpen(f"translator '{self.provider.name}' is unavailable")
+        with self._lock:
+            self._calls += 1
+
+    def _timed_out(self):
+        with self._lock:
+            self._timeouts += 1
+        self.breaker.record_failure()
+        return TimeoutError(f"translation took longer than {self.timeout:.1f}s")
+
+    def translate(self, text, language):
+        self._admit()
+        future = self._executor.submit(self.provider.translate, text, language)
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise self._timed_out()
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def stats(self):
+        with self._lock:
+            data = {"provider": self.provider.name, "timeout": self.timeout,
+                    "calls": self._calls, "timeouts": self._timeouts}
+        data["breaker"] = self.breaker.stats()
+        return data
@@ -0,0 +1,93 @@
+"""wiki.py — Cached, time-bounded Wikipedia fallback
+KIET University · JNTU Kakinada
+--------------------------------------
+The Wikipedia fallback used to be a blocking network call with no
+timeout and no cache, made only after the beam search had finished.
+
+  • cache     — summaries (and "nothing found") are stored under the
+                normalised question, so repeated weak questions cost no
+                round trip; a disambiguation page is stored as the
+                summary of the option it resolved to
+  • timeout   — callers never wait longer than `timeout` seconds; a call
+                that overruns keeps running in the background and still
+                fills the cache for the next request
+  • prefetch  — prefetch() starts the lookup next to generation so the
+                fallback is ready if the model answer is too short;
+                discard() drops it when it isn't needed (a lookup that
+                has already started finishes in the background)
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from cache import normalize_question
+
+
+class WikiLookup:
+    def __init__(self, fetch, store, timeout=3.0, max_workers=4):
+        """fetch(query) returns {"summary": str or None, "resolved": title or None}."""
+        self.fetch     = fetch
+        self.store     = store
+        self.timeout   = float(timeout)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chemai-wiki")
+        self._lock     = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "timeouts": 0,
+                          "prefetched": 0, "prefetch_used": 0, "prefetch_discarded": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _fetch_and_store(self, key, query):
+        entry = self.fetch(query)
+        self.store.set(key, entry)
+        return entry
+
+    def _submit(self, query):
+        key   = normalize_question(query)
+        entry = self.store.get(key)
+        if entry is not None:
+            self._count("hits")
+            done = Future()
+            done.set_result(entry)
+            return done
+        self._count("misses")
+        return self._executor.submit(self._fetch_and_store, key, query)
+
+    def _wait(self, future, deadline):
+        try:
+            entry = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            self._count("timeouts")
+            return None
+        except Exception as e:
+            print(f"[Wikipedia Error] {e}")
+            return None
+        return entry.get("summary") if entry else None
+
+    def lookup(self, query):
+        return self._wait(self._submit(query), time.monotonic() + self.timeout)
+
+    def prefetch(self, query):
+        self._count("prefetched")
+        return (self._submit(query), time.monotonic() + self.timeout)
+
+    def result(self, pending):
+        """Summary for a prefetch(), waiting at most until its deadline."""
+        future, deadline = pending
+        self._count("prefetch_used")
+        return self._wait(future, deadline)
+
+    def discard(self, pending):
+        self._count("prefetch_discarded")
+        pending[0].cancel()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+        total = counters["hits"] + counters["misses"]
+        counters["hit_ratio"] = round(counters["hits"] / total, 3) if total else 0.0
+        counters["size"]      = len(self.store)
+        counters["timeout"]   = self.timeout
+        return counters
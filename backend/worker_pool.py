@@ -0,0 +1,189 @@
+"""worker_pool.py — Multi-process inference with shared weights
+KIET University · JNTU Kakinada
+--------------------------------------
+A pool of inference worker processes started AFTER model.py has loaded
+the model.  Weights are moved to shared memory first (model.share_memory())
+and handed to every worker at start-up, so each maps the same physical
+pages instead of holding its own copy and nothing is loaded twice.
+
+  • Workers are spawned, not forked: each starts from a fresh interpreter
+    that imports only this module, so no server thread (MongoDB client,
+    batcher, executors) or lock is inherited half-way through its work.
+  • Each worker sets torch.set_num_threads(threads_per_worker) so that
+    workers × threads ≈ CPU cores (no oversubscription).
+  • WorkerPool.run_batch() has the same signature as the in-process batch
+    runner, so the micro-batcher dispatches whole batches to the pool and
+    keeps one batch in flight per worker.
+  • Cancellation tokens can't cross processes; run_batch() watches them
+    and sets a per-batch flag in shared memory that the worker's
+    StoppingCriteria reads, so deadlines and disconnects stop pool
+    generation too.  The worker sends back how many steps that saved, so
+    the cancellation metrics are the same as for in-process generation.
+  • Only tensors are shared: int8 weights from quantize_dynamic live in
+    packed params that share_memory() does not cover, so with
+    CHEMAI_PRECISION=int8 every worker holds its own copy.
+
+Enable with CHEMAI_WORKERS=<n> (0 = in-process generation, the default).
+Run uvicorn with a single server process (--workers 1) in this mode.
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import torch
+import torch.multiprocessing
+
+import cancellation
+
+# How often run_batch() checks the cancellation tokens of a running batch.
+CANCEL_POLL_SECONDS = 0.05
+
+# Filled in each worker by _init_worker().
+_worker = {}
+
+
+def generate_batch(model, tokenizer, prompts, max_new_tokens, generation_kwargs, cancel_tokens=None):
+    """
+    Decoded (uncleaned) outputs for `prompts`, used both in-process and in
+    the workers.  max_new_tokens is one limit for all prompts, or a list
+    with one per prompt.
+    """
+    limits = max_new_tokens if isinstance(max_new_tokens, list) else None
+    if limits:
+        max_new_tokens = max(limits)
+
+    inputs = tokenizer(
+        prompts,
+        return_tensors="pt",
+        padding=True,
+        truncation=True,
+        max_length=512
+    )
+    with torch.no_grad():
+        outputs = model.generate(
+            **inputs,
+            max_new_tokens=max_new_tokens,
+            stopping_criteria=cancellation.stopping_criteria(cancel_tokens, max_new_tokens),
+            **generation_kwargs,
+        )
+    if limits:
+        # +1 for the decoder start token at the front of every sequence
+        outputs = [seq[:limit + 1] for seq, limit in zip(outputs, limits)]
+    return tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+
+class _SharedFlag:
+    """Stands in for a batch's cancellation tokens inside a worker."""
+
+    def __init__(self, flags, slot):
+        self.flags = flags
+        self.slot  = slot
+
+    @property
+    def cancelled(self):
+        return bool(self.flags[self.slot])
+
+
+def _init_worker(model, tokenizer, generation_kwargs, flags, threads):
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+    _worker.update(model=model, tokenizer=tokenizer, kwargs=generation_kwargs, flags=flags)
+
+
+def _worker_run(prompts, max_new_tokens, slot=None):
+    """(decoded outputs, tokens saved by cancellation in this batch)."""
+    tokens = [_SharedFlag(_worker["flags"], slot)] * len(prompts) if slot is not None else None
+    before = cancellation.stats.snapshot()["tokens_saved"]
+    decoded = generate_batch(
+        _worker["model"], _worker["tokenizer"], prompts, max_new_tokens, _worker["kwargs"], tokens
+    )
+    return decoded, cancellation.stats.snapshot()["tokens_saved"] - before
+
+
+def _worker_ping():
+    return os.getpid()
+
+
+def threads_per_worker(workers, cores=None):
+    cores = cores or os.cpu_count() or 1
+    return max(1, cores // max(1, workers))
+
+
+class WorkerPool:
+    def __init__(self, model, tokenizer, generation_kwargs, workers, threads=None, postprocess=None):
+        """postprocess(decoded, prompts) runs in the server on every batch result."""
+        self.workers     = max(1, int(workers))
+        self.threads     = threads or threads_per_worker(self.workers)
+        self.postprocess = postprocess
+
+        # One copy of the weights in shared memory, mapped by every worker.
+        model.share_memory()
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+        context     = torch.multiprocessing.get_context("spawn")
+        self._flags = context.Array("b", self.workers * 2, lock=False)
+        self._slots = queue.Queue()
+        for slot in range(len(self._flags)):
+            self._slots.put(slot)
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(model, tokenizer, generation_kwargs, self._flags, self.threads),
+        )
+        pids = {f.result() for f in [self._executor.submit(_worker_ping) for _ in range(self.workers)]}
+        self._lock      = threading.Lock()
+        self._submitted = 0
+        self._cancelled = 0
+        print(f"[ChemAI] Inference pool ready: {self.workers} worker(s) × {self.threads} thread(s) "
+              f"(pids {sorted(pids)}).")
+
+    def submit(self, prompts, max_new_tokens, slot=None):
+        with self._lock:
+            self._submitted += 1
+        return self._executor.submit(_worker_run, prompts, max_new_tokens, slot)
+
+    def _result(self, prompts, future, tokens=None):
+        decoded, saved = future.result()
+        if saved:
+            cancellation.stats.record(len(tokens or prompts), saved)
+        return self.postprocess(decoded, prompts) if self.postprocess else decoded
+
+    def run_batch(self, prompts, max_new_tokens=300, cancel_tokens=None):
+        tokens = list(cancel_tokens or [])
+        if not tokens or any(t is None for t in tokens):
+            # Someone in the batch can't be cancelled: it always runs to the end.
+            return self._result(prompts, self.submit(prompts, max_new_tokens))
+
+        slot = self._slots.get()
+        self._flags[slot] = 0
+        try:
+            future = self.submit(prompts, max_new_tokens, slot)
+            while not wait([future], timeout=CANCEL_POLL_SECONDS).done:
+                if not self._flags[slot] and all(t.cancelled for t in tokens):
+                    self._flags[slot] = 1
+                    with self._lock:
+                        self._cancelled += 1
+            return self._result(prompts, future, tokens)
+        finally:
+            self._slots.put(slot)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers":            self.workers,
+                "threads_per_worker": self.threads,
+                "batches_dispatched": self._submitted,
+                "batches_cancelled":  self._cancelled,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def warm_up(pool, prompt="What is an atom?"):
+    """Run one tiny generation per worker so the first requests are not slow."""
+    wait([pool.submit([prompt], 8) for _ in range(pool.workers)])